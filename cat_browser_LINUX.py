@@ -4,30 +4,46 @@ import csv
 import random
 import json
 import time
+import sqlite3
 import importlib.util
 import inspect
 import re
-from datetime import datetime, timedelta
-from urllib.parse import quote
+import queue
+import asyncio
+import threading
+import signal
+import heapq
+import hashlib
+import codecs
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+from itertools import islice
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+from html.parser import HTMLParser
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QLineEdit, QToolBar, QTabWidget, QWidget,
-    QVBoxLayout, QLabel, QTabBar, QPushButton, QStackedLayout, QFileDialog,
-    QTextEdit, QHBoxLayout, QComboBox, QGridLayout, QDialog, QDialogButtonBox,
+    QVBoxLayout, QLabel, QTabBar, QPushButton, QFileDialog,
+    QTextEdit, QHBoxLayout, QComboBox, QDialog, QDialogButtonBox,
     QCheckBox, QScrollArea, QGroupBox, QFormLayout, QMessageBox, QMenu, QInputDialog,
-    QGraphicsDropShadowEffect, QWidgetAction, QSizePolicy
+    QGraphicsDropShadowEffect, QWidgetAction, QSizePolicy, QSpinBox, QCompleter,
+    QTableView, QAbstractItemView, QHeaderView, QListView, QStyledItemDelegate, QStyle
 )
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage, QWebEngineDownloadRequest, QWebEngineScript, QWebEngineSettings
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 from PyQt6.QtGui import (
     QPixmap, QPainter, QPen, QIcon, QFontDatabase, QAction, QFont,
-    QColor, QLinearGradient, QBrush, QPalette, QCursor, QMouseEvent
+    QColor, QLinearGradient, QBrush, QPalette, QCursor, QMouseEvent, QStandardItemModel, QStandardItem,
+    QShortcut, QKeySequence, QImage, QImageReader
 )
 from PyQt6.QtCore import (
     Qt, QUrl, QSize, QRect, QTimer, pyqtSignal as Signal, QPoint,
-    QPropertyAnimation, QEasingCurve, pyqtProperty, QRectF, QThread
+    QPropertyAnimation, QEasingCurve, pyqtProperty, QRectF, QThread, QModelIndex, QAbstractTableModel, QAbstractListModel,
+    QByteArray, QDataStream, QIODevice, QObject, QSocketNotifier, QBuffer, QEvent
 )
 
 try:
@@ -61,6 +77,9 @@ os.makedirs(FAVICON_DIR, exist_ok=True)
 THEMES_DIR = os.path.join(DATA_DIR, "themes")
 os.makedirs(THEMES_DIR, exist_ok=True)
 
+THUMBNAIL_DIR = os.path.join(DATA_DIR, "thumbnails")
+os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+
 HISTORY_FILE = os.path.join(DATA_DIR, "history.json")
 PASSWORDS_FILE = os.path.join(DATA_DIR, "passwords.csv")
 SEARCH_ENGINE_FILE = os.path.join(DATA_DIR, "search_engine.json")
@@ -68,9 +87,1021 @@ SHORTCUTS_FILE = os.path.join(DATA_DIR, "shortcuts.json")
 SETTINGS_FILE = os.path.join(DATA_DIR, "settings.json")
 SETUP_FILE = os.path.join(DATA_DIR, "setup_completed.json")
 SESSION_FILE = os.path.join(DATA_DIR, "session.json")
-TAB_STATE_FILE = os.path.join(DATA_DIR, "tab_states.json")
+PROFILE_DB = os.path.join(DATA_DIR, "profile.db")
+
+STARTUP_PROFILE_FILE = os.path.join(DATA_DIR, "startup_profile.json")
 
 DISCORD_APP_ID = "1439639890848383149"
+DISCORD_DETAILS = "made by anameless_guy on discord"
+
+
+class StartupProfiler:
+    """Records wall and cpu time per startup phase and exports a chrome trace."""
+
+    def __init__(self):
+        self.enabled = False
+        self.output_path = STARTUP_PROFILE_FILE
+        self.origin = time.perf_counter()
+        self.events = []
+        self.open_spans = {}
+        self.first_paint_seen = False
+        self.done = False
+
+    def enable(self, output_path=None):
+        self.enabled = True
+        if output_path:
+            self.output_path = os.path.abspath(output_path)
+        print(f"startup profiler: enabled, writing timeline to {self.output_path}")
+
+    def now_us(self):
+        return (time.perf_counter() - self.origin) * 1000000
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled or self.done:
+            yield
+            return
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def begin(self, name):
+        if not self.enabled or self.done:
+            return
+        self.open_spans[name] = (self.now_us(), time.process_time())
+
+    def end(self, name):
+        if not self.enabled or name not in self.open_spans:
+            return
+        start_us, start_cpu = self.open_spans.pop(name)
+        self.events.append({
+            'name': name,
+            'cat': 'startup',
+            'ph': 'X',
+            'ts': round(start_us, 1),
+            'dur': round(self.now_us() - start_us, 1),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': {'cpu_ms': round((time.process_time() - start_cpu) * 1000, 3)}
+        })
+
+    def mark(self, name):
+        if not self.enabled or self.done:
+            return
+        self.events.append({
+            'name': name,
+            'cat': 'startup',
+            'ph': 'i',
+            's': 'g',
+            'ts': round(self.now_us(), 1),
+            'pid': os.getpid(),
+            'tid': threading.get_ident()
+        })
+
+    def watch_first_paint(self, web_view):
+        if not self.enabled or self.first_paint_seen:
+            return
+        web_view.loadFinished.connect(lambda ok: self.on_first_load(ok))
+
+    def on_first_load(self, ok):
+        if self.first_paint_seen:
+            return
+        self.first_paint_seen = True
+        self.mark("first_web_load")
+        # the compositor presents the frame on the next turn of the event loop
+        QTimer.singleShot(0, self.on_first_paint)
+
+    def on_first_paint(self):
+        self.mark("first_web_paint")
+        self.finish()
+
+    def summary(self):
+        phases = {}
+        for event in self.events:
+            if event['ph'] == 'X':
+                phases[event['name']] = {
+                    'wall_ms': round(event['dur'] / 1000, 3),
+                    'cpu_ms': event['args']['cpu_ms'],
+                    'start_ms': round(event['ts'] / 1000, 3)
+                }
+            else:
+                phases[event['name']] = {'at_ms': round(event['ts'] / 1000, 3)}
+        return phases
+
+    def finish(self):
+        if not self.enabled or self.done:
+            return
+        for name in list(self.open_spans):
+            self.end(name)
+        self.done = True
+
+        trace = {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'platform': sys.platform,
+                'python': sys.version.split()[0],
+                'recorded_at': datetime.now().isoformat(),
+                'phases': self.summary()
+            }
+        }
+        try:
+            with open(self.output_path, 'w', encoding='utf-8') as f:
+                json.dump(trace, f, indent=2)
+            print(f"startup profiler: timeline written to {self.output_path}")
+        except Exception as e:
+            print(f"startup profiler: error writing timeline {e}")
+
+        for event in sorted(self.events, key=lambda e: e.get('dur', 0), reverse=True):
+            if event['ph'] == 'X':
+                print(f"startup profiler: {event['name']:<24} wall {event['dur'] / 1000:9.2f} ms   cpu {event['args']['cpu_ms']:9.2f} ms")
+            else:
+                print(f"startup profiler: {event['name']:<24} at   {event['ts'] / 1000:9.2f} ms")
+
+
+def parse_profile_startup_arg(argv):
+    for arg in argv[1:]:
+        if arg == "--profile-startup":
+            return True, None
+        if arg.startswith("--profile-startup="):
+            return True, arg.split("=", 1)[1]
+    return False, None
+
+
+STARTUP_PROFILER = StartupProfiler()
+
+
+def url_host(url):
+    try:
+        return (urlsplit(url).hostname or "").removeprefix("www.")
+    except ValueError:
+        return ""
+
+
+def like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class HistoryEngine:
+    """Visit log on top of the profile store, nothing but the last visited url is kept in memory."""
+
+    SKIPPED_SCHEMES = ("about:", "data:", "blob:", "devtools:", "view-source:", "javascript:")
+
+    def __init__(self, store, flush_interval=3):
+        self.store = store
+        self.conn = store.conn
+        self.last_url = None
+        self.writer = HistoryWriter(store, flush_interval)
+        self.writer.start()
+
+    def add_visit(self, url, transition="link", title=None):
+        if not url or url.startswith(self.SKIPPED_SCHEMES):
+            return False
+        now = time.time()
+        if url == self.last_url and transition != "typed":
+            # pushState churn and same-url redirects collapse into the visit we already have
+            self.writer.push("touch", now, url)
+            return False
+        self.writer.push("visit", url, now, transition, title)
+        self.last_url = url
+        # the visit time, so callers can tell later whether a flush already covered it
+        return now
+
+    def set_title(self, url, title):
+        if title:
+            self.writer.push("title", url, title)
+
+    def recent_urls(self, limit=500):
+        return [row[0] for row in self.conn.execute("SELECT url FROM urls ORDER BY last_visit DESC LIMIT ?", (limit,))]
+
+    def page(self, filter_text="", after=None, limit=200):
+        # keyset paging on (last_visit, id) so deep pages cost the same as the first one
+        where, params = [], []
+        if filter_text:
+            where.append("(url LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\')")
+            params += [like_pattern(filter_text)] * 2
+        if after:
+            where.append("(last_visit, id) < (?, ?)")
+            params += list(after)
+        sql = "SELECT id, url, title, last_visit, visit_count FROM urls"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY last_visit DESC, id DESC LIMIT ?"
+        return self.conn.execute(sql, params + [limit]).fetchall()
+
+    def delete_urls(self, url_ids):
+        urls = []
+        with self.conn:
+            for url_id in url_ids:
+                row = self.conn.execute("SELECT url FROM urls WHERE id = ?", (url_id,)).fetchone()
+                if row:
+                    urls.append(row[0])
+                    # visits go with it through ON DELETE CASCADE
+                    self.conn.execute("DELETE FROM urls WHERE id = ?", (url_id,))
+        if self.last_url in urls:
+            self.last_url = None
+        return urls
+
+    def visits_for_host(self, host, limit=100):
+        return self.conn.execute("SELECT urls.url, visits.title, visits.visited_at, visits.transition FROM urls "
+                                 "JOIN visits ON visits.url_id = urls.id WHERE urls.host = ? "
+                                 "ORDER BY visits.visited_at DESC LIMIT ?", (host, limit)).fetchall()
+
+    def visit_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM visits").fetchone()[0]
+
+    def close(self):
+        self.writer.stop()
+
+
+class HistoryWriter(threading.Thread):
+    """Commits queued history writes and session checkpoints in batches on its own connection, off the ui thread."""
+
+    def __init__(self, store, flush_interval=3):
+        super().__init__(name="history-writer", daemon=True)
+        self.store = store
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue()
+        self.stop_event = threading.Event()
+        self.written = 0
+        # newest visit time known to be committed, visits are queued in time order
+        self.flushed_until = 0
+        # held across a commit and the flushed_until update, so readers see both or neither
+        self.flush_lock = threading.Lock()
+
+    def push(self, op, *args):
+        self.pending.put((op, args))
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def take_batch(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.pending.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def write_batch(self, conn, batch):
+        # only the newest session checkpoint in a batch is worth writing
+        sessions = [args for op, args in batch if op == "session"]
+        if sessions:
+            self.store.save_session(*sessions[-1], conn=conn)
+        visits = [args[1] for op, args in batch if op == "visit"]
+        with self.flush_lock, conn:
+            for op, args in batch:
+                if op == "visit":
+                    self.store.insert_visit(*args, conn=conn)
+                elif op == "touch":
+                    conn.execute("UPDATE urls SET last_visit = ? WHERE url = ?", args)
+                elif op == "title":
+                    url, title = args
+                    conn.execute("UPDATE urls SET title = ? WHERE url = ?", (title, url))
+                    conn.execute("UPDATE visits SET title = ? WHERE id = (SELECT MAX(visits.id) FROM visits "
+                                 "JOIN urls ON urls.id = visits.url_id WHERE urls.url = ?)", (title, url))
+            if visits:
+                self.flushed_until = max(visits)
+        # the wal is the journal: each flush appends its pages there and a passive checkpoint
+        # folds only those pages back into the database, without waiting on readers
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        self.written += len(batch) - len(sessions)
+
+    def run(self):
+        conn = self.store.connect()
+        while True:
+            stopping = self.stop_event.wait(self.flush_interval)
+            batch = self.take_batch()
+            if batch:
+                try:
+                    self.write_batch(conn, batch)
+                except sqlite3.Error as e:
+                    print(f"history: error writing {len(batch)} entries {e}")
+            if stopping:
+                break
+        conn.close()
+        print(f"history: {self.written} entries written")
+
+
+# (max age in days, weight), same idea as firefox frecency buckets
+FRECENCY_RECENCY_WEIGHTS = ((4, 100), (14, 70), (31, 50), (90, 30), (float("inf"), 10))
+
+
+def frecency(visit_count, typed_count, last_visit, now, bonus=0):
+    age = (now - (last_visit or 0)) / 86400
+    for max_age, weight in FRECENCY_RECENCY_WEIGHTS:
+        if age < max_age:
+            break
+    return (visit_count + 2 * typed_count + bonus) * weight
+
+
+def is_significant_url(visit_count, typed_count, last_visit, now):
+    # same cut as chrome's quick history provider, rarely visited old pages stay in sqlite only
+    return typed_count > 0 or visit_count >= 2 or now - (last_visit or 0) < 3 * 86400
+
+
+def omnibox_text(text):
+    text = text.lower()
+    for prefix in ("https://", "http://", "www."):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+    return text
+
+
+class OmniboxIndex:
+    """In-memory prefix and trigram index over the significant part of history, for url bar suggestions."""
+
+    PREFIX_LEN = 3
+    BUCKET_SIZE = 12
+    MAX_SCAN = 2000
+    MAX_FRESH = 2000
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.ids = {}
+        self.urls = []
+        self.titles = []
+        self.texts = []
+        self.stats = []
+        self.scores = []
+        self.prefixes = {}
+        self.trigrams = {}
+        # entries touched since the postings were last sorted by score
+        self.fresh = {}
+        # slots of removed entries, reused before the lists grow
+        self.free = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def load(self, conn, now=None):
+        now = now or time.time()
+        rows = conn.execute("SELECT url, title, visit_count, typed_count, last_visit FROM urls "
+                            "WHERE typed_count > 0 OR visit_count >= 2 OR last_visit > ? "
+                            "ORDER BY last_visit DESC LIMIT ?", (now - 3 * 86400, self.max_entries))
+        for url, title, visit_count, typed_count, last_visit in rows:
+            self.add(url, title, visit_count, typed_count, last_visit, now)
+        self.sort_postings()
+
+    def sort_postings(self):
+        score_of = self.scores.__getitem__
+        for posting in self.trigrams.values():
+            posting.sort(key=score_of, reverse=True)
+        self.fresh.clear()
+
+    def add(self, url, title, visit_count, typed_count, last_visit, now, bonus=0):
+        entry_id = self.ids.get(url)
+        if entry_id is None:
+            if len(self.ids) >= self.max_entries:
+                self.evict()
+            text = omnibox_text(url) + "\n" + (title or "").lower()
+            stats = [visit_count, typed_count, last_visit, bonus]
+            score = frecency(visit_count, typed_count, last_visit, now, bonus)
+            if self.free:
+                # stale postings of the old entry only fail the substring check
+                entry_id = self.free.pop()
+                self.urls[entry_id] = url
+                self.titles[entry_id] = title or ""
+                self.texts[entry_id] = text
+                self.stats[entry_id] = stats
+                self.scores[entry_id] = score
+            else:
+                entry_id = len(self.urls)
+                self.urls.append(url)
+                self.titles.append(title or "")
+                self.texts.append(text)
+                self.stats.append(stats)
+                self.scores.append(score)
+            self.ids[url] = entry_id
+            self.index_text(entry_id, text)
+        else:
+            self.stats[entry_id] = [visit_count, typed_count, last_visit, bonus]
+            self.scores[entry_id] = frecency(visit_count, typed_count, last_visit, now, bonus)
+            if title and title != self.titles[entry_id]:
+                self.set_title(url, title)
+        self.rank_prefixes(entry_id)
+        self.fresh.pop(entry_id, None)
+        self.fresh[entry_id] = True
+        if len(self.fresh) > self.MAX_FRESH:
+            del self.fresh[next(iter(self.fresh))]
+
+    def add_shortcut(self, url, name, bonus=3):
+        entry_id = self.ids.get(url)
+        now = time.time()
+        if entry_id is None:
+            self.add(url, name, 0, 0, now, now, bonus)
+        else:
+            visit_count, typed_count, last_visit, _ = self.stats[entry_id]
+            self.add(url, None, visit_count, typed_count, last_visit, now, bonus)
+
+    def record_visit(self, url, transition):
+        now = time.time()
+        entry_id = self.ids.get(url)
+        if entry_id is None:
+            self.add(url, None, 1, 1 if transition == "typed" else 0, now, now)
+            return
+        visit_count, typed_count, last_visit, bonus = self.stats[entry_id]
+        self.add(url, None, visit_count + 1, typed_count + (1 if transition == "typed" else 0), now, now, bonus)
+
+    def set_title(self, url, title):
+        entry_id = self.ids.get(url)
+        if entry_id is None or not title or title == self.titles[entry_id]:
+            return
+        old_text = self.texts[entry_id]
+        self.titles[entry_id] = title
+        self.texts[entry_id] = omnibox_text(url) + "\n" + title.lower()
+        text = self.texts[entry_id]
+        self.prune({entry_id}, self.grams(old_text) - self.grams(text), self.prefix_keys(old_text) - self.prefix_keys(text))
+        self.index_text(entry_id, text, skip=old_text)
+        self.rank_prefixes(entry_id)
+
+    def remove(self, url):
+        entry_id = self.ids.get(url)
+        if entry_id is not None:
+            self.drop([entry_id])
+
+    def evict(self):
+        # drop the lowest scored percent in one go, so a full index does not rescan on every new url
+        count = max(1, len(self.ids) // 100)
+        self.drop(heapq.nsmallest(count, self.ids.values(), key=self.scores.__getitem__))
+
+    def drop(self, entry_ids):
+        grams, prefixes = set(), set()
+        for entry_id in entry_ids:
+            self.ids.pop(self.urls[entry_id], None)
+            grams |= self.grams(self.texts[entry_id])
+            prefixes |= self.prefix_keys(self.texts[entry_id])
+            self.texts[entry_id] = ""
+            self.scores[entry_id] = -1
+            self.fresh.pop(entry_id, None)
+            self.free.append(entry_id)
+        self.prune(set(entry_ids), grams, prefixes)
+
+    def prune(self, entry_ids, grams, prefixes):
+        # one pass per touched posting, freed slots get reused and must not be found under old text
+        for table, keys in ((self.trigrams, grams), (self.prefixes, prefixes)):
+            for key in keys:
+                posting = table.get(key)
+                if posting is None:
+                    continue
+                posting[:] = [entry_id for entry_id in posting if entry_id not in entry_ids]
+                if not posting:
+                    del table[key]
+
+    def grams(self, text):
+        # url and title are joined by a newline, trigrams across it would match neither
+        return {gram for gram in (text[i:i + 3] for i in range(len(text) - 2)) if "\n" not in gram}
+
+    def prefix_keys(self, text):
+        return {token[:length] for token in self.tokens(text)
+                for length in range(1, min(len(token), self.PREFIX_LEN) + 1)}
+
+    def tokens(self, text):
+        return [token for token in re.split(r"[^\w]+", text) if token]
+
+    def index_text(self, entry_id, text, skip=""):
+        for trigram in self.grams(text) - self.grams(skip):
+            posting = self.trigrams.get(trigram)
+            if posting is None:
+                self.trigrams[trigram] = posting = []
+            posting.append(entry_id)
+
+    def rank_prefixes(self, entry_id):
+        score_of = self.scores.__getitem__
+        for prefix in self.prefix_keys(self.texts[entry_id]):
+            bucket = self.prefixes.get(prefix)
+            if bucket is None:
+                self.prefixes[prefix] = [entry_id]
+                continue
+            if entry_id not in bucket:
+                if len(bucket) >= self.BUCKET_SIZE and score_of(bucket[-1]) >= self.scores[entry_id]:
+                    continue
+                bucket.append(entry_id)
+            bucket.sort(key=score_of, reverse=True)
+            del bucket[self.BUCKET_SIZE:]
+
+    def search(self, query, limit=8):
+        words = omnibox_text(query.strip()).split()
+        if not words:
+            return []
+        texts = self.texts
+        longest = max(words, key=len)
+        if len(longest) < 3:
+            # prefix buckets are already in score order
+            found = [entry_id for entry_id in self.prefixes.get(longest, ())
+                     if all(word in texts[entry_id] for word in words)]
+        else:
+            postings = [self.trigrams.get(longest[i:i + 3]) for i in range(len(longest) - 2)]
+            if not all(postings):
+                return []
+            found = {entry_id for entry_id in self.fresh if all(word in texts[entry_id] for word in words)}
+            if len(longest) <= self.PREFIX_LEN:
+                found.update(entry_id for entry_id in self.prefixes.get(longest, ())
+                             if all(word in texts[entry_id] for word in words))
+            # postings are sorted by score, so walking the rarest one can stop at the first few hits
+            hits = 0
+            for entry_id in islice(min(postings, key=len), self.MAX_SCAN):
+                if all(word in texts[entry_id] for word in words):
+                    found.add(entry_id)
+                    hits += 1
+                    if hits >= limit:
+                        break
+        best = heapq.nlargest(limit, found, key=self.scores.__getitem__)
+        return [(self.urls[entry_id], self.titles[entry_id], self.scores[entry_id]) for entry_id in best]
+
+
+def run_omnibox_benchmark(sizes=(10000, 100000, 1000000), queries=2000):
+    words = ["cat", "news", "video", "docs", "wiki", "shop", "mail", "maps", "music", "photo", "code", "forum",
+             "blog", "game", "travel", "recipe", "weather", "sport", "science", "finance"]
+    tlds = ["com", "org", "net", "io", "dev", "co.uk"]
+    rng = random.Random(42)
+    now = time.time()
+    for size in sizes:
+        rows = []
+        for n in range(size):
+            host = f"{rng.choice(words)}{rng.choice(words)}{n % 5000}.{rng.choice(tlds)}"
+            path = "/".join(rng.choice(words) for _ in range(rng.randint(0, 3)))
+            title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 5))).title()
+            visit_count = max(1, int(rng.paretovariate(1.2)))
+            typed_count = 1 if rng.random() < 0.05 else 0
+            rows.append((f"https://www.{host}/{path}", title, visit_count, typed_count, now - rng.random() * 365 * 86400))
+
+        index = OmniboxIndex()
+        started = time.perf_counter()
+        for url, title, visit_count, typed_count, last_visit in rows:
+            if is_significant_url(visit_count, typed_count, last_visit, now):
+                index.add(url, title, visit_count, typed_count, last_visit, now)
+        index.sort_postings()
+        build_time = time.perf_counter() - started
+
+        timings = []
+        for _ in range(queries):
+            url, title = rng.choice(rows)[:2]
+            source = rng.choice((omnibox_text(url), title.lower()))
+            typed = source[:rng.randint(1, min(12, len(source)))]
+            started = time.perf_counter()
+            index.search(typed)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(f"omnibox bench: {size} history entries, {len(index)} indexed, built in {build_time:.2f}s, "
+              f"p50 {p50:.3f}ms, p99 {p99:.3f}ms")
+
+
+class ProfileStore:
+    """All user data in one sqlite database, replacing the old json/csv files."""
+
+    # each entry upgrades the schema by one version, applied in order inside one transaction
+    SCHEMA_STEPS = [
+        """
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE passwords (name TEXT PRIMARY KEY, username TEXT, password TEXT);
+        CREATE TABLE history (id INTEGER PRIMARY KEY, url TEXT NOT NULL, visited_at REAL NOT NULL);
+        CREATE INDEX history_visited_at ON history (visited_at);
+        CREATE INDEX history_url ON history (url);
+        CREATE TABLE shortcuts (id INTEGER PRIMARY KEY, position REAL NOT NULL, name TEXT, url TEXT NOT NULL);
+        CREATE INDEX shortcuts_position ON shortcuts (position);
+        CREATE TABLE session_tabs (position INTEGER PRIMARY KEY, type TEXT, url TEXT, title TEXT);
+        CREATE TABLE tab_states (tab_index INTEGER PRIMARY KEY, url TEXT, title TEXT, timestamp TEXT);
+        """,
+        """
+        CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, host TEXT, title TEXT,
+                           visit_count INTEGER NOT NULL DEFAULT 0, typed_count INTEGER NOT NULL DEFAULT 0, last_visit REAL);
+        CREATE INDEX urls_host ON urls (host);
+        CREATE INDEX urls_last_visit ON urls (last_visit);
+        CREATE TABLE visits (id INTEGER PRIMARY KEY, url_id INTEGER NOT NULL REFERENCES urls (id) ON DELETE CASCADE,
+                             visited_at REAL NOT NULL, transition TEXT, title TEXT);
+        CREATE INDEX visits_url_id ON visits (url_id);
+        CREATE INDEX visits_visited_at ON visits (visited_at);
+        CREATE TEMP TABLE old_visits AS
+            SELECT url, visited_at FROM (SELECT url, visited_at, LAG(url) OVER (ORDER BY visited_at) AS previous FROM history)
+            WHERE previous IS NULL OR previous != url;
+        INSERT INTO urls (url, host, visit_count, last_visit)
+            SELECT url, url_host(url), COUNT(*), MAX(visited_at) FROM old_visits GROUP BY url;
+        INSERT INTO visits (url_id, visited_at, transition)
+            SELECT urls.id, old_visits.visited_at, 'link' FROM old_visits JOIN urls ON urls.url = old_visits.url ORDER BY old_visits.visited_at;
+        DROP TABLE old_visits;
+        DROP TABLE history;
+        """,
+        """
+        ALTER TABLE session_tabs ADD COLUMN state TEXT;
+        DROP TABLE tab_states;
+        """,
+        """
+        CREATE TABLE favicons (host TEXT PRIMARY KEY, digest TEXT NOT NULL, icon_url TEXT, etag TEXT, last_modified TEXT, checked_at REAL);
+        """,
+    ]
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = self.connect()
+        self.saved_settings = {}
+        self.saved_passwords = {}
+        self.upgrade_schema()
+        self.migrate_legacy_files()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.create_function("url_host", 1, url_host, deterministic=True)
+        return conn
+
+    def schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def upgrade_schema(self):
+        version = self.schema_version()
+        for target in range(version + 1, len(self.SCHEMA_STEPS) + 1):
+            print(f"profile store: upgrading schema to version {target}")
+            self.conn.executescript(f"BEGIN; {self.SCHEMA_STEPS[target - 1]} PRAGMA user_version = {target}; COMMIT;")
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, str(value)))
+
+    @contextmanager
+    def legacy_import(self, name):
+        # a damaged file only loses its own data, everything else still comes across
+        self.conn.execute("SAVEPOINT legacy_file")
+        try:
+            yield
+        except Exception as e:
+            self.conn.execute("ROLLBACK TO legacy_file")
+            print(f"profile store: skipped the old {name} file {e}")
+        finally:
+            self.conn.execute("RELEASE legacy_file")
+
+    def migrate_legacy_files(self):
+        if self.get_meta("legacy_migrated"):
+            return
+
+        imported = []
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN")
+                if os.path.exists(SETTINGS_FILE):
+                    with self.legacy_import("settings"):
+                        with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                            settings = json.load(f)
+                        self.conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                              [(k, json.dumps(v)) for k, v in settings.items()])
+                        imported.append("settings")
+
+                if os.path.exists(SEARCH_ENGINE_FILE):
+                    with self.legacy_import("search engine"):
+                        with open(SEARCH_ENGINE_FILE, "r", encoding="utf-8") as f:
+                            engine = json.load(f).get("engine")
+                        if engine:
+                            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('search_engine', ?)", (engine,))
+                            imported.append("search engine")
+
+                if os.path.exists(SETUP_FILE):
+                    with self.legacy_import("setup"):
+                        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('setup_completed', '1')")
+                        imported.append("setup state")
+
+                if os.path.exists(PASSWORDS_FILE):
+                    with self.legacy_import("passwords"):
+                        with open(PASSWORDS_FILE, "r", encoding="utf-8") as f:
+                            rows = [(row["name"], row["username"], row["password"]) for row in csv.DictReader(f)
+                                    if row.get("name") and row.get("username") is not None and row.get("password") is not None]
+                        self.conn.executemany("INSERT OR REPLACE INTO passwords (name, username, password) VALUES (?, ?, ?)", rows)
+                        imported.append(f"{len(rows)} passwords")
+
+                if os.path.exists(HISTORY_FILE):
+                    with self.legacy_import("history"):
+                        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+                            urls = json.load(f)
+                        # the old file has no timestamps, keep the order by spacing them out before now
+                        start = time.time() - len(urls)
+                        previous = None
+                        for n, url in enumerate(urls):
+                            if url and url != previous:
+                                self.insert_visit(url, start + n, "link")
+                            previous = url
+                        imported.append(f"{len(urls)} history entries")
+
+                if os.path.exists(SHORTCUTS_FILE):
+                    with self.legacy_import("shortcuts"):
+                        with open(SHORTCUTS_FILE, "r", encoding="utf-8") as f:
+                            shortcuts = json.load(f)
+                        self.conn.executemany("INSERT INTO shortcuts (position, name, url) VALUES (?, ?, ?)",
+                                              [(n, sc.get('name', ''), sc['url']) for n, sc in enumerate(shortcuts) if sc.get('url')])
+                        imported.append(f"{len(shortcuts)} shortcuts")
+
+                if os.path.exists(SESSION_FILE):
+                    with self.legacy_import("session"):
+                        with open(SESSION_FILE, "r", encoding="utf-8") as f:
+                            session_data = json.load(f)
+                        self.conn.executemany("INSERT INTO session_tabs (position, type, url, title) VALUES (?, ?, ?, ?)",
+                                              [(n, t.get('type', 'web'), t.get('url'), t.get('title')) for n, t in enumerate(session_data.get('tabs', []))])
+                        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('session_current_tab', ?)",
+                                          (str(session_data.get('current_tab', 0)),))
+                        imported.append("session")
+
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated', ?)", (datetime.now().isoformat(),))
+        except Exception as e:
+            print(f"profile store: error migrating old profile files {e}")
+            return
+
+        if imported:
+            print(f"profile store: migrated {', '.join(imported)} from the old profile files")
+
+    def load_settings(self):
+        settings = {}
+        for key, value in self.conn.execute("SELECT key, value FROM settings"):
+            try:
+                settings[key] = json.loads(value)
+            except ValueError:
+                pass
+        self.saved_settings = dict(settings)
+        return settings
+
+    def save_settings(self, settings):
+        changed = [(k, json.dumps(v)) for k, v in settings.items() if self.saved_settings.get(k, None) != v or k not in self.saved_settings]
+        if not changed:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value", changed)
+        self.saved_settings = dict(settings)
+
+    def load_passwords(self):
+        passwords = {name: {"user": user, "pass": pw} for name, user, pw in
+                     self.conn.execute("SELECT name, username, password FROM passwords")}
+        self.saved_passwords = {name: dict(info) for name, info in passwords.items()}
+        return passwords
+
+    def save_passwords(self, passwords):
+        changed = [(name, info["user"], info["pass"]) for name, info in passwords.items() if self.saved_passwords.get(name) != info]
+        removed = [(name,) for name in self.saved_passwords if name not in passwords]
+        if not changed and not removed:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT INTO passwords (name, username, password) VALUES (?, ?, ?) "
+                                  "ON CONFLICT(name) DO UPDATE SET username = excluded.username, password = excluded.password", changed)
+            self.conn.executemany("DELETE FROM passwords WHERE name = ?", removed)
+        self.saved_passwords = {name: dict(info) for name, info in passwords.items()}
+
+    def insert_visit(self, url, visited_at, transition, title=None, conn=None):
+        # caller owns the transaction
+        conn = conn or self.conn
+        conn.execute("INSERT INTO urls (url, host, title, visit_count, typed_count, last_visit) VALUES (?, url_host(?), ?, 1, ?, ?) "
+                     "ON CONFLICT(url) DO UPDATE SET visit_count = visit_count + 1, typed_count = typed_count + excluded.typed_count, "
+                     "last_visit = excluded.last_visit, title = COALESCE(excluded.title, title)",
+                     (url, url, title, 1 if transition == "typed" else 0, visited_at))
+        cursor = conn.execute("INSERT INTO visits (url_id, visited_at, transition, title) VALUES ((SELECT id FROM urls WHERE url = ?), ?, ?, ?)",
+                              (url, visited_at, transition, title))
+        return cursor.lastrowid
+
+    def password_page(self, filter_text="", after=None, limit=200):
+        where, params = [], []
+        if filter_text:
+            where.append("(name LIKE ? ESCAPE '\\' OR username LIKE ? ESCAPE '\\')")
+            params += [like_pattern(filter_text)] * 2
+        if after is not None:
+            where.append("name > ?")
+            params.append(after)
+        sql = "SELECT name, username, password FROM passwords"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY name LIMIT ?"
+        return self.conn.execute(sql, params + [limit]).fetchall()
+
+    def shortcuts(self):
+        return [{'id': sc_id, 'name': name, 'url': url} for sc_id, name, url in
+                self.conn.execute("SELECT id, name, url FROM shortcuts ORDER BY position")]
+
+    def add_shortcut(self, name, url):
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO shortcuts (position, name, url) VALUES ((SELECT COALESCE(MAX(position), -1) + 1 FROM shortcuts), ?, ?)",
+                                       (name, url))
+        return cursor.lastrowid
+
+    def remove_shortcut(self, url):
+        with self.conn:
+            self.conn.execute("DELETE FROM shortcuts WHERE url = ?", (url,))
+
+    def save_session(self, tabs, current_tab, conn=None):
+        # one transaction, so a crash mid write leaves the previous checkpoint intact
+        conn = conn or self.conn
+        with conn:
+            conn.execute("DELETE FROM session_tabs")
+            conn.executemany("INSERT INTO session_tabs (position, type, url, title, state) VALUES (?, ?, ?, ?, ?)",
+                             [(n, t.get('type'), t.get('url'), t.get('title'), json.dumps(t['state']) if t.get('state') else None)
+                              for n, t in enumerate(tabs)])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('session_current_tab', ?)", (str(current_tab),))
+
+    def load_session(self):
+        tabs = [{'type': tab_type, 'url': url, 'title': title, 'state': json.loads(state) if state else None}
+                for tab_type, url, title, state in
+                self.conn.execute("SELECT type, url, title, state FROM session_tabs ORDER BY position")]
+        if not tabs:
+            return None
+        return {'tabs': tabs, 'current_tab': int(self.get_meta('session_current_tab', 0))}
+
+    def favicon(self, host):
+        row = self.conn.execute("SELECT digest, icon_url, etag, last_modified, checked_at FROM favicons WHERE host = ?", (host,)).fetchone()
+        if not row:
+            return None
+        return dict(zip(("digest", "icon_url", "etag", "last_modified", "checked_at"), row))
+
+    def save_favicon(self, host, digest, icon_url, etag, last_modified, checked_at):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO favicons (host, digest, icon_url, etag, last_modified, checked_at) VALUES (?, ?, ?, ?, ?, ?)",
+                              (host, digest, icon_url, etag, last_modified, checked_at))
+
+    def touch_favicon(self, host, checked_at):
+        with self.conn:
+            self.conn.execute("UPDATE favicons SET checked_at = ? WHERE host = ?", (checked_at, host))
+
+    def favicon_digests(self):
+        return {digest for digest, in self.conn.execute("SELECT DISTINCT digest FROM favicons")}
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception as e:
+            print(f"profile store: error closing {e}")
+
+
+class DiscordPresenceWorker(threading.Thread):
+    """Owns the discord ipc connection so the ui thread never waits on it."""
+
+    def __init__(self, app_id, max_pending=8, connect_timeout=5, min_interval=15, max_backoff=300):
+        super().__init__(name="discord-rpc", daemon=True)
+        self.app_id = app_id
+        self.updates = queue.Queue(maxsize=max_pending)
+        self.connect_timeout = connect_timeout
+        self.min_interval = min_interval
+        self.max_backoff = max_backoff
+        self.backoff = 1
+        self.stop_event = threading.Event()
+        self.rpc = None
+        self.current = None
+        self.sent = None
+        self.last_sent_at = 0
+
+    def push(self, **presence):
+        # only the newest presence matters, so drop the oldest pending one when full
+        while True:
+            try:
+                self.updates.put_nowait(presence)
+                return
+            except queue.Full:
+                try:
+                    self.updates.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def stop(self):
+        self.stop_event.set()
+        self.push()
+
+    def connect(self):
+        try:
+            rpc = Presence(self.app_id, connection_timeout=self.connect_timeout, response_timeout=self.connect_timeout)
+            rpc.connect()
+            self.rpc = rpc
+            self.backoff = 1
+            self.sent = None
+            print("discord rpc: connected")
+            return True
+        except Exception as e:
+            print(f"discord rpc: failed {e}, retrying in {self.backoff}s")
+            self.rpc = None
+            return False
+
+    def disconnect(self):
+        if self.rpc:
+            try:
+                self.rpc.close()
+            except:
+                pass
+        self.rpc = None
+
+    def drain(self):
+        while True:
+            try:
+                presence = self.updates.get_nowait()
+            except queue.Empty:
+                return
+            if presence:
+                self.current = presence
+
+    def send_current(self):
+        if not self.current or self.current == self.sent:
+            return
+        wait = self.min_interval - (time.monotonic() - self.last_sent_at)
+        if wait > 0:
+            # discord rate limits presence updates, newer updates replace this one meanwhile
+            if self.stop_event.wait(wait):
+                return
+            self.drain()
+        try:
+            self.rpc.update(**self.current)
+            self.sent = self.current
+            self.last_sent_at = time.monotonic()
+        except Exception as e:
+            print(f"discord rpc: update failed {e}")
+            self.disconnect()
+
+    def run(self):
+        # pypresence drives its socket through asyncio, which needs a loop on this thread
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        while not self.stop_event.is_set():
+            if self.rpc is None and not self.connect():
+                if self.stop_event.wait(self.backoff):
+                    break
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                self.drain()
+                continue
+
+            self.send_current()
+            if self.rpc is None:
+                continue
+
+            try:
+                presence = self.updates.get(timeout=30)
+            except queue.Empty:
+                continue
+            if presence:
+                self.current = presence
+            self.drain()
+
+        self.disconnect()
+
+
+class PixmapCache:
+    """Decodes each background image once and shares its scaled copies, keyed by (path, mtime, target size)."""
+
+    def __init__(self, max_scaled=8):
+        self.max_scaled = max_scaled
+        self.originals = {}
+        self.scaled = OrderedDict()
+        self.decodes = 0
+
+    def source_key(self, source):
+        if isinstance(source, QPixmap):
+            return ("pixmap", source.cacheKey())
+        try:
+            return (source, os.path.getmtime(source))
+        except OSError:
+            return None
+
+    def original(self, source):
+        key = self.source_key(source)
+        if key is None:
+            return None, None
+        if isinstance(source, QPixmap):
+            # already decoded, only its scaled copies are worth caching
+            return (None, None) if source.isNull() else (key, source)
+        pixmap = self.originals.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(source)
+            if pixmap.isNull():
+                return None, None
+            # an edited file gets a new mtime, the old decode and its scaled copies go
+            for stale in [k for k in self.originals if k[0] == key[0]]:
+                del self.originals[stale]
+            for stale in [k for k in self.scaled if k[0] == key[0]]:
+                del self.scaled[stale]
+            self.originals[key] = pixmap
+            self.decodes += 1
+        return key, pixmap
+
+    def get(self, source, size, smooth=True):
+        key, pixmap = self.original(source)
+        if pixmap is None or size.isEmpty():
+            return None
+        if not smooth:
+            # drags rescale on every event, those frames are cheap and not worth keeping
+            return pixmap.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation)
+        scaled_key = key + (size.width(), size.height())
+        scaled = self.scaled.get(scaled_key)
+        if scaled is None:
+            scaled = pixmap.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            self.scaled[scaled_key] = scaled
+            while len(self.scaled) > self.max_scaled:
+                self.scaled.popitem(last=False)
+        else:
+            self.scaled.move_to_end(scaled_key)
+        return scaled
+
+
+BACKGROUND_CACHE = PixmapCache()
 
 
 class ThemeEngine:
@@ -84,13 +1115,11 @@ class ThemeEngine:
         self.current_background = None
 
     def reset_all_new_tab_backgrounds(self):
-        if not hasattr(self.browser, 'tabs'):
+        if not hasattr(self.browser, 'new_tab_pages'):
             return
 
-        for i in range(self.browser.tabs.count()):
-            tab = self.browser.tabs.widget(i)
-            if hasattr(tab, 'new_tab_page') and tab.new_tab_page:
-                tab.new_tab_page.set_default_background()
+        for page in self.browser.new_tab_pages():
+            page.set_default_background()
 
     def apply_theme_to_new_tab(self, new_tab_page):
         if self.current_background and hasattr(new_tab_page, 'bg_label'):
@@ -98,17 +1127,11 @@ class ThemeEngine:
 
     def apply_background_to_tab(self, new_tab_page, bg_image, tab_index=None):
         try:
-            pixmap = QPixmap(bg_image)
-            if not pixmap.isNull():
+            if BACKGROUND_CACHE.original(bg_image)[1]:
                 if hasattr(new_tab_page, 'set_custom_background'):
-                    new_tab_page.set_custom_background(pixmap)
+                    new_tab_page.set_custom_background(bg_image)
                 else:
-                    scaled_pixmap = pixmap.scaled(
-                        new_tab_page.size(),
-                        Qt.AspectRatioMode.IgnoreAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    new_tab_page.bg_label.setPixmap(scaled_pixmap)
+                    new_tab_page.bg_label.setPixmap(BACKGROUND_CACHE.get(bg_image, new_tab_page.size()) or QPixmap())
                     new_tab_page.bg_label.setScaledContents(False)
                 if tab_index is not None:
                     print(f"theme system: applied background to new tab {tab_index}")
@@ -490,10 +1513,24 @@ class ThemeEngine:
             self.current_background = None
             return
 
-        for i in range(self.browser.tabs.count()):
-            tab = self.browser.tabs.widget(i)
-            if hasattr(tab, 'new_tab_page') and tab.new_tab_page:
-                self.apply_background_to_tab(tab.new_tab_page, bg_image, i)
+        for page in self.browser.new_tab_pages():
+            self.apply_background_to_tab(page, bg_image)
+
+FUN_FACTS = {"mtime": None, "lines": []}
+
+
+def fun_facts():
+    # read once and reused by every new tab until the file changes
+    try:
+        mtime = os.path.getmtime(FACTS_FILE)
+    except OSError:
+        return []
+    if FUN_FACTS["mtime"] != mtime:
+        with open(FACTS_FILE, "r", encoding="utf-8") as f:
+            FUN_FACTS["lines"] = [l.strip() for l in f if l.strip()]
+        FUN_FACTS["mtime"] = mtime
+    return FUN_FACTS["lines"]
+
 
 class CustomNewTabPage(QWidget):
     def __init__(self, parent=None, translator=None, theme_engine=None):
@@ -502,7 +1539,11 @@ class CustomNewTabPage(QWidget):
         self.translator = translator
         self.theme_engine = theme_engine
         self.custom_bg_applied = False
-        self.original_pixmap = None
+        self.background_source = None
+        self.smooth_scale_timer = QTimer(self)
+        self.smooth_scale_timer.setSingleShot(True)
+        self.smooth_scale_timer.setInterval(150)
+        self.smooth_scale_timer.timeout.connect(self.update_background_scaling)
 
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
@@ -560,34 +1601,13 @@ class CustomNewTabPage(QWidget):
         shortcuts_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         overlay_layout.addWidget(shortcuts_label)
 
-        self.shortcuts_container = QWidget()
-        self.shortcuts_container.setStyleSheet("background: transparent;")
-        self.shortcuts_layout = QGridLayout(self.shortcuts_container)
-        self.shortcuts_layout.setSpacing(15)
-        self.shortcuts_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.shortcuts_layout.setContentsMargins(20,10,20,10)
-
-        self.add_shortcut_btn = QPushButton("+")
-        self.add_shortcut_btn.setFixedSize(80,90)
-        self.add_shortcut_btn.setStyleSheet("""
-            QPushButton {
-                background: rgba(60,60,60,0.8);
-                border: 2px dashed #777;
-                border-radius: 8px;
-                color: #777;
-                font-size:24px;
-                font-weight:bold;
-            }
-            QPushButton:hover {
-                background: rgba(80,80,80,0.9);
-                border: 2px dashed #0078d4;
-                color: #0078d4;
-            }
-        """)
-        self.add_shortcut_btn.clicked.connect(self.add_shortcut)
-        self.shortcuts_layout.addWidget(self.add_shortcut_btn, 0, 0)
-
-        overlay_layout.addWidget(self.shortcuts_container)
+        self.shortcut_model = ShortcutModel(self.load_shortcuts(), self.parent_browser, self)
+        self.shortcut_grid = ShortcutGridView()
+        self.shortcut_grid.setModel(self.shortcut_model)
+        self.shortcut_grid.open_requested.connect(lambda url: self.parent_browser.add_tab(url))
+        self.shortcut_grid.remove_requested.connect(self.remove_shortcut)
+        self.shortcut_grid.add_requested.connect(self.add_shortcut)
+        overlay_layout.addWidget(self.shortcut_grid, 0, Qt.AlignmentFlag.AlignCenter)
 
         self.quote_label = QLabel()
         self.quote_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -620,8 +1640,6 @@ class CustomNewTabPage(QWidget):
         bottom_layout.addWidget(self.credits_btn)
         overlay_layout.addWidget(bottom_container)
 
-        self.shortcuts = self.load_shortcuts()
-        self.display_shortcuts()
         self.load_fun_fact()
 
         self.search_bar.returnPressed.connect(self.perform_search)
@@ -631,53 +1649,21 @@ class CustomNewTabPage(QWidget):
         else:
             self.set_default_background()
 
-    def download_favicon(self, url):
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            if parsed.netloc:
-                domain = parsed.netloc.replace('www.', '')
-                favicon_url = f"https://{domain}/favicon.ico"
-
-                favicon_view = QWebEngineView()
-                favicon_view.loadFinished.connect(
-                    lambda ok, view=favicon_view, dom=domain: self.save_favicon(view, dom, ok)
-                )
-                favicon_view.load(QUrl(favicon_url))
-
-        except Exception as e:
-            print(f"Error setting up favicon download: {e}")
-
-    def save_favicon(self, view, domain, ok):
-        try:
-            if ok:
-                icon = view.page().icon()
-                if not icon.isNull():
-                    pixmap = icon.pixmap(32, 32)
-                    favicon_path = os.path.join(FAVICON_DIR, f"{domain}.png")
-                    pixmap.save(favicon_path, "PNG")
-                    self.display_shortcuts()
-        except Exception as e:
-            print(f"Error saving favicon: {e}")
-        finally:
-            view.deleteLater()
-
     def resizeEvent(self, event):
         super().resizeEvent(event)
 
         self.overlay.setGeometry(0, 0, self.width(), self.height())
 
-        self.update_background_scaling()
+        # a fast scale keeps up with window drags, the smooth one follows once resizing stops
+        self.update_background_scaling(smooth=False)
+        self.smooth_scale_timer.start()
 
-    def update_background_scaling(self):
+    def update_background_scaling(self, smooth=True):
         """Update the background scaling based on current size"""
-        if hasattr(self, 'original_pixmap') and self.original_pixmap and self.custom_bg_applied:
-            scaled_pixmap = self.original_pixmap.scaled(
-                self.size(),
-                Qt.AspectRatioMode.IgnoreAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.bg_label.setPixmap(scaled_pixmap)
+        if self.background_source is not None and self.custom_bg_applied:
+            scaled_pixmap = BACKGROUND_CACHE.get(self.background_source, self.size(), smooth)
+            if scaled_pixmap:
+                self.bg_label.setPixmap(scaled_pixmap)
 
     def set_default_background(self):
         pixmap_path = None
@@ -690,21 +1676,15 @@ class CustomNewTabPage(QWidget):
 
     def set_custom_background(self, pixmap_or_path):
         pixmap = None
-        if isinstance(pixmap_or_path, QPixmap):
-            pixmap = pixmap_or_path
-        elif isinstance(pixmap_or_path, str) and os.path.exists(pixmap_or_path):
-            pixmap = QPixmap(pixmap_or_path)
-
-        if pixmap and not pixmap.isNull():
-            self.original_pixmap = pixmap
-
-            scaled_pixmap = pixmap.scaled(
-                self.size(),  
-                Qt.AspectRatioMode.IgnoreAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
+        if isinstance(pixmap_or_path, (QPixmap, str)):
+            pixmap = BACKGROUND_CACHE.original(pixmap_or_path)[1]
 
-            self.bg_label.setPixmap(scaled_pixmap)
+        if pixmap:
+            self.background_source = pixmap_or_path
+
+            scaled_pixmap = BACKGROUND_CACHE.get(pixmap_or_path, self.size())
+            if scaled_pixmap:
+                self.bg_label.setPixmap(scaled_pixmap)
             self.bg_label.setScaledContents(False)
 
             self.bg_label.setMinimumSize(1, 1)
@@ -714,88 +1694,30 @@ class CustomNewTabPage(QWidget):
         else:
             self.bg_label.setStyleSheet("background-color:#1e1e1e;")
             self.custom_bg_applied = False
-            self.original_pixmap = None
+            self.background_source = None
 
 
     def load_fun_fact(self):
-        if os.path.exists(FACTS_FILE):
-            with open(FACTS_FILE, "r", encoding="utf-8") as f:
-                lines = [l.strip() for l in f if l.strip()]
-                if lines:
-                    fact_text = random.choice(lines)
-                    self.quote_label.setText(self.translator.tr("fun_fact", "{}").format(fact_text))
-                    return
+        lines = fun_facts()
+        if lines:
+            fact_text = random.choice(lines)
+            self.quote_label.setText(self.translator.tr("fun_fact", "{}").format(fact_text))
+            return
         self.quote_label.setText(self.translator.tr("fun_fact", "fun fact:").format(""))
 
-    def load_shortcuts(self):
-        shortcuts = []
-        if os.path.exists(SHORTCUTS_FILE):
-            try:
-                with open(SHORTCUTS_FILE, "r", encoding="utf-8") as f:
-                    shortcuts = json.load(f)
-            except:
-                pass
-        return shortcuts
+    def reset_for_tab(self):
+        # the page is shared, so each new tab gets a clean search bar and a fresh fact
+        self.search_bar.clear()
+        self.load_fun_fact()
 
-    def save_shortcuts(self):
+    def load_shortcuts(self):
         try:
-            with open(SHORTCUTS_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.shortcuts, f, indent=2)
-        except:
-            pass
-
-    def display_shortcuts(self):
-        for i in reversed(range(self.shortcuts_layout.count())):
-            widget = self.shortcuts_layout.itemAt(i).widget()
-            if widget != self.add_shortcut_btn:
-                widget.deleteLater()
-
-        row, col = 0, 0
-        max_cols = 8
-
-        for shortcut in self.shortcuts:
-            container = QWidget()
-            container.setFixedSize(80, 90)
-            container_layout = QStackedLayout(container)
-            shortcut_widget = ShortcutWidget(
-                shortcut['name'], shortcut['url'], self.parent_browser
-            )
-            container_layout.addWidget(shortcut_widget)
-
-            remove_btn = QPushButton("x", container)
-            remove_btn.setFixedSize(16, 16)
-            remove_btn.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    color: white;
-                    border-radius: 3px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background: transparent;
-                }
-            """)
-            remove_btn.move(container.width() - 20, 2)
-            remove_btn.raise_()
-            remove_btn.clicked.connect(lambda checked, url=shortcut['url']: self.remove_shortcut(url))
-
-            self.shortcuts_layout.addWidget(container, row, col)
-
-            col += 1
-            if col >= max_cols:
-                col = 0
-                row += 1
-
-        self.shortcuts_layout.removeWidget(self.add_shortcut_btn)
-        if len(self.shortcuts) < 24:
-            self.shortcuts_layout.addWidget(self.add_shortcut_btn, row, col)
-            self.add_shortcut_btn.setEnabled(len(self.shortcuts) < 24)
-        else:
-            self.add_shortcut_btn.setEnabled(False)
+            return self.parent_browser.store.shortcuts()
+        except Exception as e:
+            print(f"new tab page: error loading shortcuts {e}")
+            return []
 
     def add_shortcut(self):
-        if len(self.shortcuts) >= 24:
-            return
         dialog = AddShortcutDialog(self, self.translator)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             shortcut_data = dialog.get_shortcut_data()
@@ -803,15 +1725,16 @@ class CustomNewTabPage(QWidget):
                 url = shortcut_data['url']
                 if not url.startswith(('http://','https://')):
                     url = 'https://' + url
-                self.shortcuts.append({'name': shortcut_data['name'], 'url': url})
-                self.save_shortcuts()
-                self.display_shortcuts()
-                self.download_favicon(url)
+                shortcut_id = self.parent_browser.store.add_shortcut(shortcut_data['name'], url)
+                self.parent_browser.update_omnibox_index("add_shortcut", url, shortcut_data['name'])
+                self.shortcut_model.append({'id': shortcut_id, 'name': shortcut_data['name'], 'url': url})
+
+    def refresh_favicon(self, host):
+        self.shortcut_model.refresh_icon(host)
 
     def remove_shortcut(self, url):
-        self.shortcuts = [s for s in self.shortcuts if s['url'] != url]
-        self.save_shortcuts()
-        self.display_shortcuts()
+        self.shortcut_model.remove(url)
+        self.parent_browser.store.remove_shortcut(url)
 
     def perform_search(self):
         q = self.search_bar.text().strip()
@@ -878,10 +1801,35 @@ class CustomNewTabPage(QWidget):
 
 
 class InspectorWebPage(QWebEnginePage):
+    TRANSITIONS = {
+        QWebEnginePage.NavigationType.NavigationTypeLinkClicked: "link",
+        QWebEnginePage.NavigationType.NavigationTypeTyped: "typed",
+        QWebEnginePage.NavigationType.NavigationTypeFormSubmitted: "form",
+        QWebEnginePage.NavigationType.NavigationTypeBackForward: "back_forward",
+        QWebEnginePage.NavigationType.NavigationTypeReload: "reload",
+        QWebEnginePage.NavigationType.NavigationTypeRedirect: "redirect",
+    }
+
     def __init__(self, profile, parent):
         super().__init__(profile, parent)
         self.inspector_view = None
         self.parent_browser = None
+        self.transition = "link"
+        self.hold_first_navigation = False
+
+    def acceptNavigationRequest(self, url, nav_type, is_main_frame):
+        if is_main_frame:
+            self.transition = self.TRANSITIONS.get(nav_type, "other")
+            if self.hold_first_navigation:
+                self.hold_first_navigation = False
+                if self.parent_browser and not self.parent_browser.navigation.admit(self, url):
+                    return False
+        return super().acceptNavigationRequest(url, nav_type, is_main_frame)
+
+    def take_transition(self):
+        # url changes without a navigation request are same-document (pushState, fragments)
+        transition, self.transition = self.transition, "in_page"
+        return transition
 
     def set_parent_browser(self, browser):
         self.parent_browser = browser
@@ -890,12 +1838,13 @@ class InspectorWebPage(QWebEnginePage):
         print(f"js console: {message} (line {lineNumber})")
 
     def createWindow(self, type):
-        if type == QWebEnginePage.WebWindowType.WebBrowserTab:
+        if type in (QWebEnginePage.WebWindowType.WebBrowserTab, QWebEnginePage.WebWindowType.WebBrowserBackgroundTab):
             if self.parent_browser:
-                new_tab = self.parent_browser.add_tab("about:blank")
+                background = type == QWebEnginePage.WebWindowType.WebBrowserBackgroundTab
+                new_tab = self.parent_browser.add_tab("about:blank", background=background)
                 if hasattr(new_tab, 'web_view') and new_tab.web_view:
-                    return new_tab.web_view
-            return InspectorWebView(self.profile())
+                    new_tab.web_view.page().hold_first_navigation = background
+                    return new_tab.web_view.page()
         return super().createWindow(type)
 
 class InspectorWebView(QWebEngineView):
@@ -1044,96 +1993,1542 @@ class InspectorWebView(QWebEngineView):
         else:
             self.inspector_text.setText("No element inspected yet.\nClick 'Inspect Element' and then click on any element on the page.")
 
-class Tab(QWidget):
-    def __init__(self, profile, url="https://www.google.com", is_new_tab=False, browser=None, translator=None, theme_engine=None):
-        super().__init__()
-        self.is_new_tab = is_new_tab
-        self.web_view = None
-        self.profile = profile
-        self.main_browser = browser
-        self.translator = translator
-        self.theme_engine = theme_engine
+class WebViewPool:
+    def __init__(self, browser, size=2, refill_delay=400):
+        self.browser = browser
+        self.size = size
+        self.views = []
+        self.hits = 0
+        self.misses = 0
+        self.refill_timer = QTimer()
+        self.refill_timer.setSingleShot(True)
+        self.refill_timer.setInterval(refill_delay)
+        self.refill_timer.timeout.connect(self.refill_one)
+
+    def create_view(self):
+        return InspectorWebView(self.browser.profile, browser=self.browser)
+
+    def acquire(self):
+        if self.views:
+            view = self.views.pop()
+            self.hits += 1
+        else:
+            view = self.create_view()
+            self.misses += 1
+        self.schedule_refill()
+        return view
+
+    def schedule_refill(self, delay=None):
+        if len(self.views) < self.size and not self.refill_timer.isActive():
+            self.refill_timer.start(delay if delay is not None else self.refill_timer.interval())
+
+    def refill_one(self):
+        # one view per idle slot, so building the pool never stalls input for long.
+        # views are not navigated: chromium picks the renderer per site on the first real load
+        if len(self.views) >= self.size:
+            return
+        self.views.append(self.create_view())
+        self.schedule_refill()
+
+    def resize(self, size):
+        self.size = max(0, size)
+        while len(self.views) > self.size:
+            self.views.pop().deleteLater()
+        self.schedule_refill()
+
+    def clear(self):
+        self.refill_timer.stop()
+        while self.views:
+            self.views.pop().deleteLater()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': self.size,
+            'ready': len(self.views),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
 
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0,0,0,0)
-        layout.setSpacing(0)
+class TabRecord:
+    __slots__ = ("tab_id", "url", "title", "icon_key", "last_access", "discard_state", "audible", "pinned")
 
-        if is_new_tab:
-            self.new_tab_page = CustomNewTabPage(self.main_browser, self.translator, theme_engine)
-            layout.addWidget(self.new_tab_page)
-            self.web_view = None
-        elif url and url.startswith("settings://"):
-            label = QLabel("Invalid tab type")
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(label)
-            self.web_view = None
-            self.new_tab_page = None
-        else:
-            self.web_view = InspectorWebView(profile, self, browser=self.main_browser)
-            self.web_view.setUrl(QUrl(url) if url else QUrl("https://www.google.com"))
+    def __init__(self, tab_id, url="", title=""):
+        self.tab_id = tab_id
+        self.url = url
+        self.title = title
+        self.icon_key = url_host(url) if url else ""
+        self.last_access = time.monotonic()
+        self.discard_state = "live"
+        self.audible = False
+        self.pinned = False
 
-            if self.web_view.page():
-                self.web_view.page().fullScreenRequested.connect(self.handle_fullscreen_request)
 
-            layout.addWidget(self.web_view)
-            self.new_tab_page = None
+class TabRegistry:
+    """Stable ids for open tabs, so per-tab state never depends on where the tab sits in the bar."""
 
-        self.setLayout(layout)
+    def __init__(self):
+        self.next_id = 1
+        self.records = {}
+        self.widgets = {}
 
-    def handle_fullscreen_request(self, request):
-        request.accept()
-        if request.toggleOn():
-            self.main_browser.showFullScreen()
-            if hasattr(self.main_browser, 'nav_toolbar'):
-                self.main_browser.nav_toolbar.hide()
-        else:
-            self.main_browser.showNormal()
-            if hasattr(self.main_browser, 'nav_toolbar'):
-                self.main_browser.nav_toolbar.show()
+    def __len__(self):
+        return len(self.records)
 
-class SetupWizard(QDialog):
-    finished = Signal()
+    def __iter__(self):
+        return iter(list(self.records.values()))
 
-    def __init__(self, browser):
-        super().__init__()
-        print("setup: starting...")
-        self.browser = browser
-        self.translator = browser.translator
-        self.setWindowTitle(self.translator.tr("setup_wizard", "Setup Cat Browser"))
-        self.setFixedSize(600, 500)
-        self.setStyleSheet("""
-            QDialog {
-                background: #1a1a1a;
-                color: white;
-            }
-            QLabel {
-                color: white;
-                font-size: 16px;
-                font-weight: 500;
-            }
-            QComboBox, QCheckBox {
-                color: white;
-                font-size: 14px;
-            }
-            QPushButton {
-                background: #0078d4;
-                color: white;
-                border: none;
-                padding: 10px 20px;
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-                min-width: 100px;
-            }
-            QPushButton:hover {
-                background: #106ebe;
-            }
-            QPushButton:pressed {
-                background: #005a9e;
-            }
-        """)
+    def register(self, widget, url="", title=""):
+        tab_id = self.next_id
+        self.next_id += 1
+        widget.tab_id = tab_id
+        record = TabRecord(tab_id, url, title)
+        self.records[tab_id] = record
+        self.widgets[tab_id] = widget
+        return record
 
-        self.setup_steps = []
+    def unregister(self, widget):
+        tab_id = getattr(widget, 'tab_id', None)
+        self.widgets.pop(tab_id, None)
+        return self.records.pop(tab_id, None)
+
+    def record(self, widget):
+        return self.records.get(getattr(widget, 'tab_id', None))
+
+    def widget(self, tab_id):
+        return self.widgets.get(tab_id)
+
+    def touch(self, widget):
+        record = self.record(widget)
+        if record:
+            record.last_access = time.monotonic()
+
+
+def serialize_history(web_view):
+    history = web_view.history()
+    if history.count() == 0:
+        return None
+    data = QByteArray()
+    stream = QDataStream(data, QIODevice.OpenModeFlag.WriteOnly)
+    stream << history
+    return bytes(data.toBase64()).decode("ascii")
+
+
+def restore_history(web_view, encoded):
+    # loads the current entry itself, with the back/forward stack and page state behind it
+    try:
+        data = QByteArray.fromBase64(encoded.encode("ascii"))
+        stream = QDataStream(data, QIODevice.OpenModeFlag.ReadOnly)
+        stream >> web_view.history()
+        return web_view.history().count() > 0
+    except Exception as e:
+        print(f"memory saver: error restoring tab history {e}")
+        return False
+
+
+class ThumbnailEncoder(threading.Thread):
+    """Scales and jpeg encodes grabbed tab images off the ui thread."""
+
+    def __init__(self, cache):
+        super().__init__(name="thumbnail-encoder", daemon=True)
+        self.cache = cache
+        self.pending = queue.Queue()
+
+    def push(self, tab_id, image):
+        self.pending.put((tab_id, image))
+
+    def stop(self, timeout=2):
+        self.pending.put(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            tab_id, image = item
+            try:
+                scaled = image.scaledToWidth(self.cache.width, Qt.TransformationMode.SmoothTransformation)
+                data = QByteArray()
+                buffer = QBuffer(data)
+                buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+                scaled.save(buffer, "JPEG", self.cache.quality)
+                buffer.close()
+                self.cache.put(tab_id, bytes(data))
+            except Exception as e:
+                print(f"thumbnails: error encoding tab {tab_id} {e}")
+            finally:
+                self.cache.encoded(tab_id)
+
+
+class ThumbnailCache:
+    """Jpeg thumbnails of tabs in a size bounded lru, the least recently used spill to disk."""
+
+    def __init__(self, directory, max_bytes=8 * 1024 * 1024, width=320, quality=70):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.width = width
+        self.quality = quality
+        self.entries = OrderedDict()
+        self.size = 0
+        # tabs closed while an encode is still queued, held only until those encodes are done
+        self.dropped = set()
+        self.queued = {}
+        self.lock = threading.Lock()
+
+        # tab ids only live for one run, so spilled thumbnails from the last one are useless
+        for name in os.listdir(directory):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+        self.encoder = ThumbnailEncoder(self)
+        self.encoder.start()
+
+    def spill_path(self, tab_id):
+        return os.path.join(self.directory, f"{tab_id}.jpg")
+
+    def capture(self, tab_id, widget):
+        pixmap = widget.grab()
+        if pixmap.isNull():
+            return None
+        with self.lock:
+            self.queued[tab_id] = self.queued.get(tab_id, 0) + 1
+        self.encoder.push(tab_id, pixmap.toImage())
+        return pixmap
+
+    def encoded(self, tab_id):
+        with self.lock:
+            left = self.queued.pop(tab_id, 1) - 1
+            if left > 0:
+                self.queued[tab_id] = left
+            else:
+                self.dropped.discard(tab_id)
+
+    def put(self, tab_id, data):
+        spilled = []
+        with self.lock:
+            if tab_id in self.dropped:
+                return
+            old = self.entries.pop(tab_id, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[tab_id] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                spilled.append(self.entries.popitem(last=False))
+                self.size -= len(spilled[-1][1])
+        for old_id, old_data in spilled:
+            try:
+                with open(self.spill_path(old_id), "wb") as f:
+                    f.write(old_data)
+            except OSError as e:
+                print(f"thumbnails: error spilling tab {old_id} {e}")
+
+    def get(self, tab_id):
+        with self.lock:
+            data = self.entries.get(tab_id)
+            if data is not None:
+                self.entries.move_to_end(tab_id)
+        if data is None:
+            try:
+                with open(self.spill_path(tab_id), "rb") as f:
+                    data = f.read()
+            except OSError:
+                return None
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(data, "JPEG"):
+            return None
+        return pixmap
+
+    def forget(self, tab_id):
+        with self.lock:
+            if tab_id in self.queued:
+                self.dropped.add(tab_id)
+            data = self.entries.pop(tab_id, None)
+            if data is not None:
+                self.size -= len(data)
+        try:
+            os.remove(self.spill_path(tab_id))
+        except OSError:
+            pass
+
+    def close(self):
+        self.encoder.stop()
+
+
+def decode_favicon(data, size=32):
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    reader.setDecideFormatFromContent(True)
+    if bytes(reader.format()) in (b"svg", b"svgz"):
+        reader.setScaledSize(QSize(size, size))
+    # ico files carry several sizes, keep the smallest one that still covers the target
+    best = QImage()
+    for _ in range(max(1, reader.imageCount())):
+        image = reader.read()
+        if image.isNull():
+            break
+        if best.isNull() or (best.width() < size and image.width() > best.width()) or size <= image.width() < best.width():
+            best = image
+        if not reader.jumpToNextImage():
+            break
+    if best.isNull():
+        return None
+    if best.width() != size or best.height() != size:
+        best = best.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    return best
+
+
+class FaviconLinkParser(HTMLParser):
+    """Collects the <link rel=icon> candidates from the head of a page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.icons = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.done = True
+        if tag != "link" or self.done:
+            return
+        attrs = dict(attrs)
+        rel = (attrs.get("rel") or "").lower().split()
+        href = (attrs.get("href") or "").strip()
+        if href and ("icon" in rel or "apple-touch-icon" in rel):
+            self.icons.append((rel, href, (attrs.get("sizes") or "").lower(), (attrs.get("type") or "").lower()))
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+
+
+def pick_favicon(icons, size=32, svg=True):
+    # an svg scales to anything, then the closest size at or above the target, touch icons only as a fallback
+    def score(icon):
+        rel, href, sizes, kind = icon
+        touch = "icon" not in rel
+        if "svg" in kind or href.lower().split("?")[0].endswith(".svg") or sizes == "any":
+            return (touch, 0 if svg else 9, 0)
+        widths = [int(s.split("x")[0]) for s in sizes.split() if s.split("x")[0].isdigit()]
+        if not widths:
+            return (touch, 2, 0)
+        width = min(widths, key=lambda w: (w < size, abs(w - size)))
+        return (touch, 1 if width >= size else 3, abs(width - size))
+
+    candidates = sorted(icons, key=score)
+    if not candidates or score(candidates[0])[1] == 9:
+        return None
+    return candidates[0][1]
+
+
+class FaviconDecoder(threading.Thread):
+    """Hashes, stores and decodes favicon bytes off the ui thread, and encodes icons harvested from tabs."""
+
+    def __init__(self, service, referenced):
+        super().__init__(name="favicon-decoder", daemon=True)
+        self.service = service
+        self.referenced = referenced
+        self.pending = queue.Queue()
+
+    def push(self, host, data=None, path=None, meta=None, image=None):
+        self.pending.put((host, data, path, meta, image))
+
+    def stop(self, timeout=2):
+        self.pending.put(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    def prune(self):
+        # content files nothing points at any more, left behind when a site changed its icon
+        for name in os.listdir(self.service.directory):
+            if len(name) == 40 and name not in self.referenced:
+                try:
+                    os.remove(os.path.join(self.service.directory, name))
+                except OSError:
+                    pass
+
+    def run(self):
+        self.prune()
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            host, data, path, meta, image = item
+            digest = ""
+            try:
+                if image is not None:
+                    encoded = QByteArray()
+                    buffer = QBuffer(encoded)
+                    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+                    image.save(buffer, "PNG")
+                    buffer.close()
+                    data = bytes(encoded)
+                elif data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                digest = hashlib.sha1(data).hexdigest()
+                if image is None:
+                    image = decode_favicon(data, self.service.SIZE)
+                if image is not None and meta is not None:
+                    target = self.service.content_path(digest)
+                    if not os.path.exists(target):
+                        with open(target + ".tmp", "wb") as f:
+                            f.write(data)
+                        os.replace(target + ".tmp", target)
+                    if path:
+                        os.remove(path)
+            except Exception as e:
+                print(f"favicons: error decoding icon for {host} {e}")
+            self.service.decoded.emit(host, image or QImage(), digest, meta)
+
+
+class FaviconService(QObject):
+    """Site icons fetched over plain http, content addressed on disk and kept as pixmaps in a small lru."""
+
+    ready = Signal(str)
+    decoded = Signal(str, QImage, str, object)
+
+    SIZE = 32
+    MAX_FETCHES = 4
+    MAX_PIXMAPS = 256
+    MAX_AGE = 7 * 86400
+    RETRY_AFTER = 3600
+    MAX_PAGE_BYTES = 256 * 1024
+    MAX_ICON_BYTES = 512 * 1024
+
+    def __init__(self, store, directory, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.directory = directory
+        self.network = QNetworkAccessManager(self)
+        self.network.setTransferTimeout(15000)
+        self.svg = b"svg" in [bytes(f) for f in QImageReader.supportedImageFormats()]
+        self.pixmaps = OrderedDict()
+        self.loading = set()
+        self.absent = set()
+        self.failed = {}
+        self.harvested = set()
+        self.jobs = {}
+        self.queue = deque()
+        self.running = 0
+        self.stats = {"hits": 0, "misses": 0, "fetched": 0, "revalidated": 0, "harvested": 0}
+        self.decoded.connect(self.on_decoded)
+        self.decoder = FaviconDecoder(self, store.favicon_digests())
+        self.decoder.start()
+
+    def content_path(self, digest):
+        return os.path.join(self.directory, digest)
+
+    def legacy_path(self, host):
+        return os.path.join(self.directory, f"{host}.png")
+
+    def icon(self, url, fetch=False):
+        # returns what is in memory right now, anything else arrives later through ready
+        host = url_host(url)
+        if not host:
+            return None
+        pixmap = self.pixmaps.get(host)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(host)
+            self.stats["hits"] += 1
+            return pixmap
+        self.stats["misses"] += 1
+        self.load(host, url if fetch else None)
+        return None
+
+    def harvest(self, url, icon):
+        # icons the engine already fetched for an open page, so nothing else has to ask the network for them
+        host = url_host(url)
+        if not host or icon.isNull() or host in self.harvested:
+            return
+        self.harvested.add(host)
+        image = icon.pixmap(self.SIZE, self.SIZE).toImage()
+        if image.isNull():
+            return
+        if image.width() != self.SIZE or image.height() != self.SIZE:
+            image = image.scaled(self.SIZE, self.SIZE, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        self.absent.discard(host)
+        self.failed.pop(host, None)
+        self.remember(host, image)
+        row = self.store.favicon(host)
+        if row and os.path.exists(self.content_path(row["digest"])) and time.time() - (row["checked_at"] or 0) < self.MAX_AGE:
+            self.ready.emit(host)
+            return
+        self.loading.add(host)
+        self.decoder.push(host, image=image, meta={"icon_url": None, "etag": None, "last_modified": None, "harvested": True})
+
+    def load(self, host, page_url=None):
+        if host in self.loading or host in self.jobs:
+            return
+        if host in self.absent and not page_url:
+            return
+        row = self.store.favicon(host)
+        if row and os.path.exists(self.content_path(row["digest"])):
+            self.loading.add(host)
+            self.decoder.push(host, path=self.content_path(row["digest"]))
+            if time.time() - (row["checked_at"] or 0) > self.MAX_AGE:
+                self.fetch(host, page_url, row)
+        elif os.path.exists(self.legacy_path(host)):
+            # icons saved by the old downloader move into the content store on first use
+            self.loading.add(host)
+            self.decoder.push(host, path=self.legacy_path(host), meta={"icon_url": None, "etag": None, "last_modified": None})
+        elif page_url:
+            self.fetch(host, page_url)
+        else:
+            self.absent.add(host)
+
+    def fetch(self, host, page_url=None, row=None):
+        if host in self.jobs or time.time() - self.failed.get(host, 0) < self.RETRY_AFTER:
+            return
+        job = {"host": host, "page_url": page_url, "row": row, "reply": None, "icon_url": None}
+        self.jobs[host] = job
+        self.queue.append(job)
+        self.pump()
+
+    def pump(self):
+        while self.queue and self.running < self.MAX_FETCHES:
+            job = self.queue.popleft()
+            self.running += 1
+            row = job["row"]
+            if row and row["icon_url"]:
+                self.request_icon(job, row["icon_url"])
+            elif job["page_url"]:
+                job["parser"] = FaviconLinkParser()
+                job["text"] = codecs.getincrementaldecoder("utf-8")("replace")
+                job["received"] = 0
+                reply = self.request(job, job["page_url"])
+                reply.readyRead.connect(lambda j=job, r=reply: self.on_page_data(j, r))
+                reply.finished.connect(lambda j=job, r=reply: self.on_page_data(j, r, True))
+            else:
+                self.request_icon(job, f"https://{job['host']}/favicon.ico")
+
+    def request(self, job, url, headers=None):
+        request = QNetworkRequest(QUrl(url))
+        request.setAttribute(QNetworkRequest.Attribute.RedirectPolicyAttribute, QNetworkRequest.RedirectPolicy.NoLessSafeRedirectPolicy)
+        for name, value in (headers or {}).items():
+            request.setRawHeader(name.encode(), value.encode("latin-1"))
+        reply = self.network.get(request)
+        job["reply"] = reply
+        return reply
+
+    def on_page_data(self, job, reply, finished=False):
+        if job["reply"] is not reply:
+            return
+        chunk = bytes(reply.readAll())
+        job["received"] += len(chunk)
+        parser = job["parser"]
+        if not parser.done:
+            parser.feed(job["text"].decode(chunk, finished))
+        # only the head matters, stop reading once it is over
+        if not (finished or parser.done or job["received"] > self.MAX_PAGE_BYTES):
+            return
+        base = reply.url()
+        job["reply"] = None
+        reply.abort()
+        reply.deleteLater()
+        href = pick_favicon(parser.icons, self.SIZE, self.svg)
+        icon_url = base.resolved(QUrl(href or "/favicon.ico"))
+        if icon_url.scheme() not in ("http", "https"):
+            icon_url = QUrl(f"https://{job['host']}/favicon.ico")
+        self.request_icon(job, icon_url.toString())
+
+    def request_icon(self, job, url):
+        headers = {}
+        row = job["row"]
+        if row and row["icon_url"] == url:
+            if row["etag"]:
+                headers["If-None-Match"] = row["etag"]
+            if row["last_modified"]:
+                headers["If-Modified-Since"] = row["last_modified"]
+        job["icon_url"] = url
+        reply = self.request(job, url, headers)
+        reply.finished.connect(lambda j=job, r=reply: self.on_icon_finished(j, r))
+
+    def on_icon_finished(self, job, reply):
+        if job["reply"] is not reply:
+            return
+        reply.deleteLater()
+        host = job["host"]
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        data = b""
+        if reply.error() == QNetworkReply.NetworkError.NoError and status == 200:
+            data = bytes(reply.read(self.MAX_ICON_BYTES + 1))
+        if status == 304 and job["row"]:
+            self.store.touch_favicon(host, time.time())
+            self.stats["revalidated"] += 1
+        elif 0 < len(data) <= self.MAX_ICON_BYTES:
+            self.loading.add(host)
+            self.decoder.push(host, data=data, meta={
+                "icon_url": job["icon_url"],
+                "etag": bytes(reply.rawHeader(b"ETag")).decode("latin-1") or None,
+                "last_modified": bytes(reply.rawHeader(b"Last-Modified")).decode("latin-1") or None,
+                "network": True,
+            })
+        elif job["icon_url"] != f"https://{host}/favicon.ico":
+            # the icon the page pointed at is gone, the root one is the last try
+            self.request_icon(job, f"https://{host}/favicon.ico")
+            return
+        else:
+            self.failed[host] = time.time()
+            print(f"favicons: no icon for {host} ({reply.errorString() if reply.error() != QNetworkReply.NetworkError.NoError else status})")
+        self.finish(job)
+
+    def finish(self, job):
+        self.jobs.pop(job["host"], None)
+        self.running -= 1
+        self.pump()
+
+    def on_decoded(self, host, image, digest, meta):
+        self.loading.discard(host)
+        if image.isNull():
+            if meta is not None:
+                self.failed[host] = time.time()
+            return
+        if meta is not None:
+            self.store.save_favicon(host, digest, meta["icon_url"], meta["etag"], meta["last_modified"], time.time())
+            if meta.get("network"):
+                self.stats["fetched"] += 1
+            elif meta.get("harvested"):
+                self.stats["harvested"] += 1
+        self.absent.discard(host)
+        self.remember(host, image)
+        self.ready.emit(host)
+
+    def remember(self, host, image):
+        self.pixmaps[host] = QPixmap.fromImage(image)
+        self.pixmaps.move_to_end(host)
+        while len(self.pixmaps) > self.MAX_PIXMAPS:
+            self.pixmaps.popitem(last=False)
+
+    def close(self):
+        # aborting emits finished right away, so the handlers must already see the job as dead
+        self.queue.clear()
+        for job in list(self.jobs.values()):
+            reply, job["reply"] = job["reply"], None
+            if reply:
+                reply.abort()
+        self.jobs.clear()
+        self.decoder.stop()
+
+
+class TabDiscarder:
+    """Unloads background tabs and brings them back, discard state stays in memory until the session is saved."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.states = {}
+
+    def discard(self, tab):
+        registry = self.browser.tab_registry
+        record = registry.record(tab)
+        if not record or not getattr(tab, 'web_view', None):
+            return False
+        try:
+            url = tab.current_url()
+            state = self.capture(tab)
+            state["discarded_at"] = time.time()
+            # a hidden view has no fresh frame, the thumbnail from when it was last shown is the good one
+            thumbnail = self.browser.thumbnails.get(record.tab_id)
+            if thumbnail is None and tab.web_view.isVisible():
+                thumbnail = self.browser.thumbnails.capture(record.tab_id, tab.web_view)
+
+            if tab.web_view.page():
+                tab.web_view.page().setAudioMuted(True)
+
+            layout = tab.layout()
+            for i in reversed(range(layout.count())):
+                widget = layout.itemAt(i).widget()
+                if widget and widget is not tab.web_view:
+                    widget.deleteLater()
+
+            placeholder_text = "Tab unloaded to save memory"
+            if url:
+                placeholder_text += f"\n\nURL: {url}\nClick anywhere to reload"
+
+            placeholder = QLabel(placeholder_text)
+            placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            placeholder.setStyleSheet("""
+                QLabel {
+                    color: white;
+                    background: #2b2b2b;
+                    font-size: 14px;
+                    padding: 40px;
+                    border: 1px solid #444;
+                    border-radius: 8px;
+                }
+            """)
+            if thumbnail:
+                # the last frame of the page stands in for it, the text shrinks to a caption below
+                placeholder.setStyleSheet(placeholder.styleSheet().replace("padding: 40px;", "padding: 8px;"))
+                preview = QLabel()
+                preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                preview.setStyleSheet("background: #2b2b2b;")
+                preview.setPixmap(thumbnail.scaled(tab.size() * 0.9, Qt.AspectRatioMode.KeepAspectRatio,
+                                                   Qt.TransformationMode.SmoothTransformation))
+                preview.mousePressEvent = lambda event, t=tab: self.restore(t)
+                layout.addWidget(preview, 1)
+            placeholder.mousePressEvent = lambda event, t=tab: self.restore(t)
+            layout.addWidget(placeholder)
+
+            tab.web_view.deleteLater()
+            tab.web_view = None
+            tab.pending_url = url or None
+            tab.pending_title = record.title
+            record.discard_state = "discarded"
+            self.states[record.tab_id] = state
+            self.browser.mark_session_dirty(tab)
+            return True
+        except Exception as e:
+            print(f"memory saver: error discarding tab {record.tab_id}: {e}")
+            return False
+
+    def freeze(self, tab):
+        # frozen pages keep their dom and js heap but stop running timers and tasks
+        record = self.browser.tab_registry.record(tab)
+        if not record or record.audible or not getattr(tab, 'web_view', None):
+            return False
+        page = tab.web_view.page()
+        if page.isVisible() or page.lifecycleState() != QWebEnginePage.LifecycleState.Active:
+            return False
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+        record.discard_state = "frozen"
+        return True
+
+    def thaw(self, tab):
+        record = self.browser.tab_registry.record(tab)
+        if not record or record.discard_state != "frozen":
+            return False
+        if getattr(tab, 'web_view', None):
+            tab.web_view.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        record.discard_state = "live"
+        return True
+
+    def restore(self, tab):
+        # the tab already carries its url as a pending load, so this is the lazy tab path
+        return self.browser.load_lazy_tab(tab)
+
+    def capture(self, tab):
+        state = {}
+        if getattr(tab, 'web_view', None):
+            history = serialize_history(tab.web_view)
+            if history:
+                state["history"] = history
+            position = tab.web_view.page().scrollPosition()
+            state["scroll"] = [position.x(), position.y()]
+        return state
+
+    def take_state(self, tab):
+        record = self.browser.tab_registry.record(tab)
+        return self.states.pop(record.tab_id, None) if record else None
+
+    def adopt(self, tab, state):
+        record = self.browser.tab_registry.record(tab)
+        if record and state:
+            record.discard_state = "discarded"
+            self.states[record.tab_id] = dict(state)
+
+    def forget(self, tab_id):
+        self.states.pop(tab_id, None)
+
+    def session_state(self, tab):
+        record = self.browser.tab_registry.record(tab)
+        if not record:
+            return None
+        if getattr(tab, 'web_view', None):
+            return self.capture(tab) or None
+        return self.states.get(record.tab_id)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def process_rss(pid):
+    statm = read_text(f"/proc/{pid}/statm")
+    if statm:
+        return int(statm.split()[1]) * PAGE_SIZE
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return 0
+
+
+def process_cpu_time(pid):
+    stat = read_text(f"/proc/{pid}/stat")
+    if stat:
+        # the command name may contain spaces, utime and stime are fields 14 and 15
+        fields = stat.rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    try:
+        import psutil
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    except Exception:
+        return None
+
+
+def physical_memory():
+    meminfo = read_text("/proc/meminfo")
+    if meminfo:
+        for line in meminfo.splitlines():
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) * 1024
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except Exception:
+        return None
+
+
+def cgroup_memory_limit():
+    # cgroup v2 exposes memory.max on the unified hierarchy, v1 memory.limit_in_bytes on the memory controller
+    cgroups = read_text("/proc/self/cgroup")
+    if not cgroups:
+        return None
+    limits = []
+    for line in cgroups.splitlines():
+        _, controllers, path = line.split(":", 2)
+        if controllers == "":
+            base, name = "/sys/fs/cgroup", "memory.max"
+        elif "memory" in controllers.split(","):
+            base, name = "/sys/fs/cgroup/memory", "memory.limit_in_bytes"
+        else:
+            continue
+        path = path.rstrip("/")
+        while True:
+            value = read_text(f"{base}{path}/{name}")
+            if value and value.isdigit():
+                limits.append(int(value))
+            if not path:
+                break
+            path = path.rsplit("/", 1)[0]
+    return min(limits) if limits else None
+
+
+class MemoryPressureMonitor(QObject):
+    """Watches memory pressure and discards background tabs when the browser runs over its budget."""
+
+    PSI_PATH = "/proc/pressure/memory"
+    # 150ms of stalls inside a 2s window, unprivileged triggers need a window that is a multiple of 2s
+    PSI_TRIGGER = b"some 150000 2000000"
+    POLL_INTERVAL = 5000
+    FALLBACK_INTERVAL = 30000
+    PSI_AVG10_LIMIT = 10.0
+    BUDGET_RATIO = 0.8
+    FALLBACK_BUDGET = 2000 * 1024 * 1024
+    COOLDOWN = 10
+
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.browser = browser
+        self.budget = self.memory_budget()
+        self.last_cleanup = 0
+        self.psi_fd = None
+        self.notifier = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+
+        if self.open_psi_trigger():
+            self.notifier = QSocketNotifier(self.psi_fd, QSocketNotifier.Type.Exception, self)
+            self.notifier.activated.connect(self.on_pressure_event)
+            self.timer.start(self.FALLBACK_INTERVAL)
+            mode = "psi trigger"
+        elif read_text(self.PSI_PATH):
+            self.timer.start(self.POLL_INTERVAL)
+            mode = "psi polling"
+        else:
+            self.timer.start(self.FALLBACK_INTERVAL)
+            mode = "rss polling"
+        print(f"memory pressure: {mode}, budget {self.budget / 1024 / 1024:.0f} mb")
+
+    def memory_budget(self):
+        limit = cgroup_memory_limit()
+        total = physical_memory()
+        if limit and total and limit >= total:
+            # v1 reports "unlimited" as a huge number, anything above physical memory is no limit
+            limit = None
+        if limit:
+            return int(limit * self.BUDGET_RATIO)
+        if total:
+            return int(total * self.BUDGET_RATIO)
+        return self.FALLBACK_BUDGET
+
+    def open_psi_trigger(self):
+        if not hasattr(os, "O_NONBLOCK"):
+            return False
+        try:
+            self.psi_fd = os.open(self.PSI_PATH, os.O_RDWR | os.O_NONBLOCK)
+            os.write(self.psi_fd, self.PSI_TRIGGER)
+            return True
+        except OSError as e:
+            if self.psi_fd is not None:
+                os.close(self.psi_fd)
+                self.psi_fd = None
+            print(f"memory pressure: psi trigger unavailable ({e})")
+            return False
+
+    def pressure_avg10(self):
+        psi = read_text(self.PSI_PATH)
+        if not psi:
+            return 0.0
+        for field in psi.splitlines()[0].split():
+            if field.startswith("avg10="):
+                return float(field[6:])
+        return 0.0
+
+    def on_pressure_event(self):
+        self.relieve(f"psi stall, avg10 {self.pressure_avg10():.1f}%", force=True)
+
+    def poll(self):
+        if self.notifier is None:
+            avg10 = self.pressure_avg10()
+            if avg10 >= self.PSI_AVG10_LIMIT:
+                self.relieve(f"psi avg10 {avg10:.1f}%", force=True)
+                return
+        self.relieve("over budget")
+
+    def tab_costs(self):
+        # renderers can host several tabs of the same site, split their rss between them
+        shared = {}
+        for record in self.browser.tab_registry:
+            tab = self.browser.tab_registry.widget(record.tab_id)
+            view = getattr(tab, 'web_view', None)
+            if view and view.page():
+                pid = view.page().renderProcessPid()
+                if pid > 0:
+                    shared.setdefault(pid, []).append(tab)
+        costs = {}
+        usage = process_rss(os.getpid())
+        for pid, tabs in shared.items():
+            rss = process_rss(pid)
+            usage += rss
+            for tab in tabs:
+                costs[tab] = rss / len(tabs)
+        return usage, costs
+
+    def relieve(self, reason, force=False):
+        try:
+            usage, costs = self.tab_costs()
+            over = usage - self.budget
+            if over <= 0 and not force:
+                return
+            now = time.monotonic()
+            if now - self.last_cleanup < self.COOLDOWN:
+                return
+            self.last_cleanup = now
+
+            candidates = []
+            for tab in self.browser.idle_background_tabs(60):
+                record = self.browser.tab_registry.record(tab)
+                if record.audible or record.pinned:
+                    continue
+                idle = now - record.last_access
+                size = costs.get(tab, 0)
+                # minutes idle plus 1 per 50 mb, a big idle tab goes before a small one idle for as long
+                score = idle / 60 + size / (50 * 1024 * 1024)
+                candidates.append((score, record.tab_id, tab, idle, size))
+            candidates.sort(reverse=True)
+
+            print(f"memory pressure: {reason}, using {usage / 1024 / 1024:.0f} of {self.budget / 1024 / 1024:.0f} mb")
+            for score, _, tab, idle, size in candidates:
+                title = self.browser.tab_registry.record(tab).title or tab.current_url()
+                if not self.browser.discarder.discard(tab):
+                    continue
+                print(f"memory pressure: discarded '{title}' ({size / 1024 / 1024:.0f} mb, idle {idle / 60:.0f} min, score {score:.1f}) - {reason}")
+                over -= size
+                force = False
+                if over <= 0:
+                    break
+        except Exception as e:
+            print(f"memory pressure: error {e}")
+
+    def stop(self):
+        self.timer.stop()
+        if self.notifier:
+            self.notifier.setEnabled(False)
+        if self.psi_fd is not None:
+            os.close(self.psi_fd)
+            self.psi_fd = None
+
+
+class EnergySaver:
+    """Mutes and freezes hidden tabs while energy saver is on, and counts the renderer cpu time that saved."""
+
+    GRACE = 30
+    INTERVAL = 10000
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.enabled = False
+        self.visible_tab = None
+        self.muted = set()
+        self.throttled = set()
+        self.samples = {}
+        self.rates = {}
+        self.cpu_saved = 0.0
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.tick)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.browser.profile.settings().setAttribute(QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, enabled)
+        if enabled:
+            self.timer.start(self.INTERVAL)
+            current = self.browser.tabs.currentWidget()
+            for record in self.browser.tab_registry:
+                tab = self.browser.tab_registry.widget(record.tab_id)
+                if tab is not current:
+                    self.mute(tab)
+        else:
+            self.timer.stop()
+            for tab_id in list(self.muted):
+                self.unmute(self.browser.tab_registry.widget(tab_id))
+            self.samples.clear()
+            self.rates.clear()
+
+    def exempt(self, record):
+        return record.audible or record.pinned
+
+    def mute(self, tab):
+        record = self.browser.tab_registry.record(tab)
+        if not self.enabled or not record or self.exempt(record) or not getattr(tab, 'web_view', None):
+            return
+        tab.web_view.page().setAudioMuted(True)
+        self.muted.add(record.tab_id)
+
+    def unmute(self, tab):
+        record = self.browser.tab_registry.record(tab)
+        if not record or record.tab_id not in self.muted:
+            return
+        self.muted.discard(record.tab_id)
+        if getattr(tab, 'web_view', None):
+            tab.web_view.page().setAudioMuted(False)
+
+    def on_tab_shown(self, tab):
+        previous, self.visible_tab = self.visible_tab, tab
+        self.unmute(tab)
+        if previous is not None and previous is not tab:
+            self.mute(previous)
+
+    def on_view_connected(self, tab):
+        # a fresh page in a background tab starts out muted, the usual autoplay source
+        record = self.browser.tab_registry.record(tab)
+        if record:
+            self.muted.discard(record.tab_id)
+        if tab is not self.browser.tabs.currentWidget():
+            self.mute(tab)
+
+    def forget(self, tab_id):
+        self.muted.discard(tab_id)
+        self.throttled.discard(tab_id)
+
+    def tick(self):
+        registry = self.browser.tab_registry
+        current = self.browser.tabs.currentWidget()
+        now = time.monotonic()
+
+        renderers = {}
+        for record in registry:
+            tab = registry.widget(record.tab_id)
+            view = getattr(tab, 'web_view', None)
+            if view and view.page():
+                pid = view.page().renderProcessPid()
+                if pid > 0:
+                    renderers.setdefault(pid, []).append((record, tab))
+            if record.discard_state != "frozen":
+                self.throttled.discard(record.tab_id)
+
+        # a renderer's background rate is measured while it runs hidden, then compared once all its tabs are frozen
+        unmeasured = set()
+        for pid, tabs in renderers.items():
+            cpu = process_cpu_time(pid)
+            previous = self.samples.get(pid)
+            self.samples[pid] = (now, cpu)
+            if cpu is None or previous is None or previous[1] is None:
+                if cpu is not None and all(tab is not current for _, tab in tabs):
+                    unmeasured.add(pid)
+                continue
+            elapsed, used = now - previous[0], cpu - previous[1]
+            if elapsed <= 0:
+                continue
+            throttled = [record for record, _ in tabs if record.tab_id in self.throttled]
+            if not throttled:
+                if all(tab is not current for _, tab in tabs):
+                    self.rates[pid] = used / elapsed
+            elif len(throttled) == len(tabs) and pid in self.rates:
+                self.cpu_saved += max(0.0, self.rates[pid] * elapsed - used)
+        for cache in (self.samples, self.rates):
+            for pid in [pid for pid in cache if pid not in renderers]:
+                del cache[pid]
+
+        # give a new renderer one interval of measurement before freezing it
+        for tab in self.browser.idle_background_tabs(self.GRACE, states=("live",)):
+            record = registry.record(tab)
+            if self.exempt(record) or tab.web_view.page().renderProcessPid() in unmeasured:
+                continue
+            if self.browser.discarder.freeze(tab):
+                self.throttled.add(record.tab_id)
+
+
+class ClosedTabStack:
+    """Recently closed tabs for reopening, the newest few stay alive, muted and frozen, for a grace period."""
+
+    MAX_ENTRIES = 25
+    MAX_LIVE = 3
+    MAX_LIVE_BYTES = 300 * 1024 * 1024
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.entries = []
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.expire)
+
+    def grace(self):
+        return int(self.browser.settings.get("closed_tab_grace_seconds", 60))
+
+    def push(self, tab, index, record):
+        entry = {
+            "url": record.url,
+            "title": record.title,
+            "pinned": record.pinned,
+            "index": index,
+            "closed_at": time.monotonic(),
+            "tab": None,
+            "state": None,
+            "size": 0,
+        }
+        view = getattr(tab, 'web_view', None)
+        if view and self.grace() > 0:
+            # the tab widget keeps its view and signal wiring, so putting it back needs no reload
+            page = view.page()
+            page.setAudioMuted(True)
+            if page.lifecycleState() == QWebEnginePage.LifecycleState.Active:
+                page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            entry["tab"] = tab
+            entry["size"] = process_rss(page.renderProcessPid()) if page.renderProcessPid() > 0 else 0
+        else:
+            entry["state"] = self.browser.discarder.session_state(tab)
+            self.browser.destroy_tab(tab)
+        self.entries.append(entry)
+
+        for old in self.entries[:-self.MAX_ENTRIES]:
+            if old["tab"]:
+                self.bury(old)
+        del self.entries[:-self.MAX_ENTRIES]
+        self.expire()
+        if any(entry["tab"] for entry in self.entries) and not self.timer.isActive():
+            self.timer.start(5000)
+
+    def bury(self, entry):
+        tab = entry["tab"]
+        entry["tab"] = None
+        # the registry record is gone by now, so read the history straight from the still live view
+        entry["state"] = self.browser.discarder.capture(tab) or None
+        self.browser.destroy_tab(tab)
+        tab.deleteLater()
+
+    def expire(self):
+        now = time.monotonic()
+        live = [entry for entry in self.entries if entry["tab"]]
+        # newest first, a live entry survives while it is inside the grace period, the count and the memory cap
+        budget = self.MAX_LIVE_BYTES
+        for n, entry in enumerate(reversed(live)):
+            budget -= entry["size"]
+            if n >= self.MAX_LIVE or budget < 0 or now - entry["closed_at"] > self.grace():
+                self.bury(entry)
+        if not any(entry["tab"] for entry in self.entries):
+            self.timer.stop()
+
+    def pop(self):
+        if not self.entries:
+            return None
+        return self.entries.pop()
+
+    def clear(self):
+        for entry in self.entries:
+            if entry["tab"]:
+                self.bury(entry)
+        self.entries = []
+        self.timer.stop()
+
+
+class NavigationScheduler:
+    """Caps how many background tabs load at once, the current tab never waits in line."""
+
+    LOAD_TIMEOUT = 30
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.queue = []
+        self.loading = {}
+        self.waits = deque(maxlen=200)
+        self.started = 0
+
+    def limit(self):
+        return max(1, int(self.browser.settings.get("restore_concurrency", 3)))
+
+    def tab_for_page(self, page):
+        for record in self.browser.tab_registry:
+            tab = self.browser.tab_registry.widget(record.tab_id)
+            if getattr(tab, 'web_view', None) and tab.web_view.page() is page:
+                return tab
+        return None
+
+    def admit(self, page, url):
+        # first navigation of a page opened in the background, it either takes a free slot or waits as a lazy tab
+        tab = self.tab_for_page(page)
+        if tab is None or tab is self.browser.tabs.currentWidget():
+            return True
+        if len(self.loading) < self.limit():
+            now = time.monotonic()
+            self.track(tab, now, now)
+            return True
+        QTimer.singleShot(0, lambda: self.defer(tab, url.toString()))
+        return False
+
+    def defer(self, tab, url):
+        index = self.browser.tabs.indexOf(tab)
+        if index < 0:
+            return
+        tab.defer(url)
+        record = self.browser.tab_registry.record(tab)
+        if record:
+            record.url = url
+        self.browser.tabs.setTabText(index, url[:20] + "..." if len(url) > 23 else url)
+        self.enqueue(tab)
+
+    def enqueue(self, tab):
+        if tab in self.loading or any(queued is tab for queued, _ in self.queue):
+            return
+        self.queue.append((tab, time.monotonic()))
+        self.pump()
+
+    def promote(self, tab):
+        for n, (queued, queued_at) in enumerate(self.queue):
+            if queued is tab:
+                del self.queue[n]
+                self.waits.append(time.monotonic() - queued_at)
+                self.started += 1
+                return
+
+    def pump(self):
+        while self.queue and len(self.loading) < self.limit():
+            tab, queued_at = self.queue.pop(0)
+            if self.browser.tabs.indexOf(tab) < 0 or not self.browser.load_lazy_tab(tab):
+                continue
+            self.track(tab, queued_at, time.monotonic())
+
+    def track(self, tab, queued_at, now):
+        self.waits.append(now - queued_at)
+        self.started += 1
+        self.loading[tab] = now
+        tab.web_view.loadFinished.connect(lambda ok, t=tab, s=now: self.finished(t, s))
+        # a load that never finishes must not hold its slot forever
+        QTimer.singleShot(self.LOAD_TIMEOUT * 1000, lambda t=tab, s=now: self.finished(t, s))
+
+    def finished(self, tab, started):
+        if self.loading.get(tab) == started:
+            del self.loading[tab]
+            self.pump()
+
+    def forget(self, tab):
+        self.queue = [(queued, queued_at) for queued, queued_at in self.queue if queued is not tab]
+        if self.loading.pop(tab, None) is not None:
+            self.pump()
+
+    def stats(self):
+        waits = list(self.waits)
+        return {
+            "queued": len(self.queue),
+            "loading": len(self.loading),
+            "started": self.started,
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "max_wait": max(waits) if waits else 0.0,
+        }
+
+
+class ProcessSampler(QThread):
+    """Samples cpu and memory of renderer processes away from the ui thread."""
+    sampled = Signal(dict)
+
+    def __init__(self, interval=2):
+        super().__init__()
+        self.interval = interval
+        self.pids = set()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.running = True
+        self.last_cpu_time = {}
+        self.psutil_procs = {}
+
+    def set_pids(self, pids):
+        with self.lock:
+            self.pids = set(pids)
+
+    def set_interval(self, interval):
+        self.interval = interval
+        self.wake.set()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        self.wait()
+
+    def sample_proc(self, pid, elapsed):
+        cpu_time = process_cpu_time(pid)
+        if cpu_time is None:
+            return None
+        previous = self.last_cpu_time.get(pid)
+        self.last_cpu_time[pid] = cpu_time
+        cpu = 0.0
+        if previous is not None and elapsed > 0:
+            cpu = (cpu_time - previous) / elapsed * 100
+
+        pss = None
+        rollup = read_text(f"/proc/{pid}/smaps_rollup")
+        if rollup:
+            for line in rollup.splitlines():
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1]) * 1024
+                    break
+        return {"cpu": cpu, "rss": process_rss(pid), "pss": pss}
+
+    def sample_psutil(self, pid):
+        import psutil
+        proc = self.psutil_procs.get(pid)
+        if proc is None:
+            proc = self.psutil_procs[pid] = psutil.Process(pid)
+            proc.cpu_percent(None)
+        return {"cpu": proc.cpu_percent(None), "rss": proc.memory_info().rss, "pss": None}
+
+    def run(self):
+        use_proc = os.path.exists("/proc/self/stat")
+        last = time.monotonic()
+        while self.running:
+            with self.lock:
+                pids = set(self.pids)
+            now = time.monotonic()
+            elapsed, last = now - last, now
+
+            samples = {}
+            for pid in pids:
+                try:
+                    sample = self.sample_proc(pid, elapsed) if use_proc else self.sample_psutil(pid)
+                except Exception:
+                    sample = None
+                if sample:
+                    samples[pid] = sample
+            for cache in (self.last_cpu_time, self.psutil_procs):
+                for pid in [pid for pid in cache if pid not in pids]:
+                    del cache[pid]
+
+            self.sampled.emit(samples)
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+
+class Tab(QWidget):
+    def __init__(self, profile, url="https://www.google.com", is_new_tab=False, browser=None, translator=None, theme_engine=None, lazy=False, title=None):
+        super().__init__()
+        self.is_new_tab = is_new_tab
+        self.web_view = None
+        self.profile = profile
+        self.main_browser = browser
+        self.translator = translator
+        self.theme_engine = theme_engine
+        self.pending_url = None
+        self.pending_title = title
+        self.tab_id = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0,0,0,0)
+        layout.setSpacing(0)
+
+        if is_new_tab:
+            self.new_tab_page = self.main_browser.get_new_tab_page()
+            self.web_view = None
+        elif url and url.startswith("settings://"):
+            label = QLabel("Invalid tab type")
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            layout.addWidget(label)
+            self.web_view = None
+            self.new_tab_page = None
+        elif lazy and url:
+            self.pending_url = url
+            self.new_tab_page = None
+            layout.addWidget(self.create_placeholder())
+        elif url == "about:blank":
+            # pages opened by createWindow, the caller navigates the view itself
+            self.new_tab_page = None
+            self.create_web_view(None)
+        else:
+            self.new_tab_page = None
+            self.create_web_view(url or "https://www.google.com")
+
+        self.setLayout(layout)
+        if is_new_tab:
+            self.show_new_tab_page()
+
+    def show_new_tab_page(self):
+        page = self.new_tab_page
+        if not page or page.parentWidget() is self:
+            return
+        host = page.parentWidget()
+        if isinstance(host, Tab):
+            host.layout().removeWidget(page)
+        self.layout().addWidget(page)
+        page.show()
+        page.reset_for_tab()
+
+    def release_new_tab_page(self):
+        page = self.new_tab_page
+        if page and page.parentWidget() is self:
+            self.layout().removeWidget(page)
+            page.hide()
+            page.setParent(self.main_browser)
+
+    def create_placeholder(self):
+        placeholder = QLabel(f"{self.pending_title or ''}\n\n{self.pending_url}".strip())
+        placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        placeholder.setWordWrap(True)
+        placeholder.setStyleSheet("color: #888; background: #1e1e1e; font-size: 14px;")
+        return placeholder
+
+    def create_web_view(self, url):
+        if self.main_browser and getattr(self.main_browser, 'view_pool', None):
+            self.web_view = self.main_browser.view_pool.acquire()
+        else:
+            self.web_view = InspectorWebView(self.profile, self, browser=self.main_browser)
+        if url:
+            self.web_view.setUrl(QUrl(url))
+
+        if self.web_view.page():
+            self.web_view.page().fullScreenRequested.connect(self.handle_fullscreen_request)
+
+        self.layout().addWidget(self.web_view)
+
+    def is_lazy(self):
+        return self.web_view is None and self.pending_url is not None and not self.is_new_tab
+
+    def defer(self, url):
+        # a background tab that has to wait for a load slot shows its url until the scheduler loads it
+        layout = self.layout()
+        for i in reversed(range(layout.count())):
+            widget = layout.itemAt(i).widget()
+            if widget:
+                widget.deleteLater()
+        self.web_view = None
+        self.pending_url = url
+        layout.addWidget(self.create_placeholder())
+
+    def load_pending(self, state=None):
+        if not self.is_lazy():
+            return False
+
+        layout = self.layout()
+        for i in reversed(range(layout.count())):
+            widget = layout.itemAt(i).widget()
+            if widget:
+                widget.deleteLater()
+
+        url = self.pending_url
+        self.pending_url = None
+        if state and state.get("history"):
+            self.create_web_view(None)
+            if not restore_history(self.web_view, state["history"]):
+                self.web_view.setUrl(QUrl(url))
+        else:
+            self.create_web_view(url)
+        if state and state.get("scroll"):
+            self.restore_scroll(*state["scroll"])
+        return True
+
+    def restore_scroll(self, x, y):
+        if not x and not y:
+            return
+        view = self.web_view
+
+        def apply(ok):
+            view.loadFinished.disconnect(apply)
+            # chromium usually restores the offset from the history entry, only step in when it did not
+            if ok and view.page().scrollPosition().isNull():
+                view.page().runJavaScript(f"window.scrollTo({x}, {y});")
+
+        view.loadFinished.connect(apply)
+
+    def current_url(self):
+        if self.web_view:
+            return self.web_view.url().toString()
+        return self.pending_url or ""
+
+    def handle_fullscreen_request(self, request):
+        request.accept()
+        if request.toggleOn():
+            self.main_browser.showFullScreen()
+            if hasattr(self.main_browser, 'nav_toolbar'):
+                self.main_browser.nav_toolbar.hide()
+        else:
+            self.main_browser.showNormal()
+            if hasattr(self.main_browser, 'nav_toolbar'):
+                self.main_browser.nav_toolbar.show()
+
+class SetupWizard(QDialog):
+    finished = Signal()
+
+    def __init__(self, browser):
+        super().__init__()
+        print("setup: starting...")
+        self.browser = browser
+        self.translator = browser.translator
+        self.setWindowTitle(self.translator.tr("setup_wizard", "Setup Cat Browser"))
+        self.setFixedSize(600, 500)
+        self.setStyleSheet("""
+            QDialog {
+                background: #1a1a1a;
+                color: white;
+            }
+            QLabel {
+                color: white;
+                font-size: 16px;
+                font-weight: 500;
+            }
+            QComboBox, QCheckBox {
+                color: white;
+                font-size: 14px;
+            }
+            QPushButton {
+                background: #0078d4;
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-size: 14px;
+                font-weight: bold;
+                min-width: 100px;
+            }
+            QPushButton:hover {
+                background: #106ebe;
+            }
+            QPushButton:pressed {
+                background: #005a9e;
+            }
+        """)
+
+        self.setup_steps = []
         self.current_step = 0
         self.results = {}
 
@@ -1541,8 +3936,7 @@ class SetupWizard(QDialog):
         self.browser.save_settings()
 
 
-        with open(SETUP_FILE, 'w') as f:
-            json.dump({'completed': True}, f)
+        self.browser.store.set_meta("setup_completed", "1")
 
         self.finished.emit()
         self.accept()
@@ -1706,98 +4100,237 @@ class AddShortcutDialog(QDialog):
             'url': self.url_input.text().strip()
         }
 
-class ShortcutWidget(QWidget):
-    def __init__(self, name, url, browser, parent=None):
+class ShortcutModel(QAbstractListModel):
+    """Pinned sites for the new tab page, the row after the last shortcut is the add tile."""
+
+    def __init__(self, shortcuts, browser, parent=None):
         super().__init__(parent)
-        self.name = name
-        self.url = url
+        self.shortcuts = shortcuts
         self.browser = browser
-        self.setFixedSize(80, 90)
-        self.setStyleSheet("""
-            ShortcutWidget {
-                background: rgba(60, 60, 60, 150);
-                border: 1px solid #555;
-                border-radius: 8px;
-            }
-            ShortcutWidget:hover {
-                background: rgba(80, 80, 80, 150);
-                border: 1px solid #0078d4;
-            }
-        """)
 
-        layout = QVBoxLayout(self)
-        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.setSpacing(5)
-        layout.setContentsMargins(5, 5, 5, 5)
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.shortcuts) + 1
 
-        self.icon_label = QLabel()
-        self.icon_label.setFixedSize(32, 32)
-        self.icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.icon_label.setStyleSheet("""
-            QLabel {
-                background: transparent;
-                border-radius: 6px;
-            }
-        """)
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.shortcuts):
+            return None
+        shortcut = self.shortcuts[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return shortcut['name'] if role == Qt.ItemDataRole.DisplayRole else shortcut['url']
+        if role == Qt.ItemDataRole.UserRole:
+            return shortcut['url']
+        if role == Qt.ItemDataRole.DecorationRole:
+            # only asked for tiles that get painted, so icons load as they scroll into view
+            return self.browser.favicons.icon(shortcut['url'], fetch=True)
+        return None
 
-        self.load_favicon()
-
-        self.name_label = QLabel(name)
-        self.name_label.setStyleSheet("color: white; font-size: 11px;")
-        self.name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.name_label.setWordWrap(True)
-        self.name_label.setMaximumWidth(70)
-
-        layout.addWidget(self.icon_label)
-        layout.addWidget(self.name_label)
-
-    def load_favicon(self):
-        domain = self.extract_domain(self.url)
-        if domain:
-            favicon_path = os.path.join(FAVICON_DIR, f"{domain}.png")
-            if os.path.exists(favicon_path):
-                pixmap = QPixmap(favicon_path)
-                if not pixmap.isNull():
-                    self.icon_label.setPixmap(pixmap.scaled(32, 32, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-                    return
+    def append(self, shortcut):
+        row = len(self.shortcuts)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.shortcuts.append(shortcut)
+        self.endInsertRows()
+
+    def remove(self, url):
+        for row, shortcut in enumerate(self.shortcuts):
+            if shortcut['url'] == url:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.shortcuts[row]
+                self.endRemoveRows()
+                return
 
-        fallback_text = self.name[0].upper() if self.name else "?"
-        self.icon_label.setText(fallback_text)
-        self.icon_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 14px;
-                font-weight: bold;
-                background: #0078d4;
-                border-radius: 16px;
-                min-width: 32px;
-                max-width: 32px;
-                min-height: 32px;
-                max-height: 32px;
-            }
-        """)
+    def refresh_icon(self, host):
+        for row, shortcut in enumerate(self.shortcuts):
+            if url_host(shortcut['url']) == host:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
 
-    def extract_domain(self, url):
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            if parsed.netloc:
-                return parsed.netloc.replace('www.', '')
-        except:
-            pass
-        return None
 
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            if self.url:
-                self.browser.add_tab(self.url)
-        super().mousePressEvent(event)
+class ShortcutDelegate(QStyledItemDelegate):
+    """Paints shortcut tiles directly instead of building a widget with stylesheets for each one."""
+
+    TILE = QSize(80, 90)
+
+    def sizeHint(self, option, index):
+        return self.TILE
+
+    def tile_rect(self, rect):
+        tile = QRect(QPoint(0, 0), self.TILE)
+        tile.moveCenter(rect.center())
+        return tile
+
+    def remove_rect(self, rect):
+        tile = self.tile_rect(rect)
+        return QRect(tile.right() - 19, tile.top() + 2, 16, 16)
+
+    def paint(self, painter, option, index):
+        view = option.widget
+        tile = self.tile_rect(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        url = index.data(Qt.ItemDataRole.UserRole)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        frame = QRectF(tile).adjusted(0.5, 0.5, -0.5, -0.5)
+
+        if url is None:
+            pen = QPen(QColor("#0078d4" if hovered else "#777"), 2, Qt.PenStyle.DashLine)
+            painter.setPen(pen)
+            painter.setBrush(QColor(80, 80, 80, 230) if hovered else QColor(60, 60, 60, 204))
+            painter.drawRoundedRect(frame.adjusted(0.5, 0.5, -0.5, -0.5), 8, 8)
+            font = QFont(option.font)
+            font.setPixelSize(24)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.drawText(tile, Qt.AlignmentFlag.AlignCenter, "+")
+            painter.restore()
+            return
+
+        painter.setPen(QPen(QColor("#0078d4" if hovered else "#555"), 1))
+        painter.setBrush(QColor(80, 80, 80, 150) if hovered else QColor(60, 60, 60, 150))
+        painter.drawRoundedRect(frame, 8, 8)
+
+        icon_rect = QRect(tile.center().x() - 15, tile.top() + 10, 32, 32)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        name = index.data(Qt.ItemDataRole.DisplayRole) or ""
+        if pixmap:
+            painter.drawPixmap(icon_rect, pixmap)
+        else:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("#0078d4"))
+            painter.drawEllipse(icon_rect)
+            font = QFont(option.font)
+            font.setPixelSize(14)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(QColor("white"))
+            painter.drawText(icon_rect, Qt.AlignmentFlag.AlignCenter, name[:1].upper() or "?")
+
+        font = QFont(option.font)
+        font.setPixelSize(11)
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        text_rect = QRect(tile.left() + 5, icon_rect.bottom() + 6, tile.width() - 10, tile.bottom() - icon_rect.bottom() - 10)
+        text = painter.fontMetrics().elidedText(name, Qt.TextElideMode.ElideRight, text_rect.width() * 2 - 10)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop | Qt.TextFlag.TextWordWrap, text)
+
+        if hovered:
+            remove = self.remove_rect(option.rect)
+            under_mouse = view is not None and remove.contains(view.hover_pos)
+            painter.setPen(QColor("#0078d4" if under_mouse else "white"))
+            font.setPixelSize(12)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.drawText(remove, Qt.AlignmentFlag.AlignCenter, "x")
+        painter.restore()
+
+
+class ShortcutGridView(QListView):
+    """Virtualized grid of shortcut tiles, only the visible rows are painted."""
+
+    open_requested = Signal(str)
+    remove_requested = Signal(str)
+    add_requested = Signal()
+
+    MAX_COLUMNS = 8
+    MAX_ROWS = 3
+    SPACING = 15
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hover_pos = QPoint(-1, -1)
+        self.setItemDelegate(ShortcutDelegate(self))
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setUniformItemSizes(True)
+        self.setGridSize(ShortcutDelegate.TILE + QSize(self.SPACING, self.SPACING))
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setFrameShape(QListView.Shape.NoFrame)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+        self.viewport().setAutoFillBackground(False)
+        self.setStyleSheet("QListView { background: transparent; }")
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.rowsInserted.connect(self.fit_to_contents)
+        model.rowsRemoved.connect(self.fit_to_contents)
+        model.modelReset.connect(self.fit_to_contents)
+        self.fit_to_contents()
+
+    def fit_to_contents(self, *args):
+        count = self.model().rowCount() if self.model() else 0
+        grid = self.gridSize()
+        columns = max(1, min(self.MAX_COLUMNS, count))
+        rows = max(1, (count + self.MAX_COLUMNS - 1) // self.MAX_COLUMNS)
+        width = columns * grid.width() + 4
+        if rows > self.MAX_ROWS:
+            width += self.verticalScrollBar().sizeHint().width()
+        self.setFixedSize(width, min(rows, self.MAX_ROWS) * grid.height() + 4)
+
+    def mouseMoveEvent(self, event):
+        self.hover_pos = event.position().toPoint()
+        index = self.indexAt(self.hover_pos)
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.hover_pos = QPoint(-1, -1)
+        super().leaveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        if event.button() != Qt.MouseButton.LeftButton or not index.isValid():
+            super().mouseReleaseEvent(event)
+            return
+        rect = self.visualRect(index)
+        if not self.itemDelegate().tile_rect(rect).contains(pos):
+            return
+        url = index.data(Qt.ItemDataRole.UserRole)
+        if url is None:
+            self.add_requested.emit()
+        elif self.itemDelegate().remove_rect(rect).contains(pos):
+            self.remove_requested.emit(url)
+        else:
+            self.open_requested.emit(url)
+
 
 class ModernTabBar(QTabBar):
     def __init__(self):
         super().__init__()
         self.setDrawBase(False)
         self.setExpanding(False)
+        self.setMouseTracking(True)
+        self.preview_provider = None
+        self.preview_index = -1
+        self.preview = QLabel(self)
+        self.preview.setWindowFlags(Qt.WindowType.ToolTip)
+        self.preview.setStyleSheet("border: 1px solid #555; background: #2b2b2b;")
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip and self.preview_provider:
+            index = self.tabAt(event.pos())
+            pixmap = self.preview_provider(index) if index >= 0 else None
+            if pixmap:
+                self.preview_index = index
+                self.preview.setPixmap(pixmap.scaledToWidth(240, Qt.TransformationMode.SmoothTransformation))
+                self.preview.adjustSize()
+                self.preview.move(self.mapToGlobal(self.tabRect(index).bottomLeft()))
+                self.preview.show()
+                return True
+            self.preview.hide()
+        elif event.type() in (QEvent.Type.Leave, QEvent.Type.MouseButtonPress):
+            self.preview.hide()
+        elif event.type() == QEvent.Type.MouseMove and self.preview.isVisible():
+            if self.tabAt(event.position().toPoint()) != self.preview_index:
+                self.preview.hide()
+        return super().event(event)
 
     def tabSizeHint(self, index):
         return QSize(200, 35)
@@ -1899,6 +4432,75 @@ class WelcomeScreen(QWidget):
         self.close_splash()
         event.accept()
 
+class StoreTableModel(QAbstractTableModel):
+    """Read-only table over a paged store query, rows are fetched as the view scrolls."""
+
+    def __init__(self, headers, fetch_page, page_size=200, parent=None, decoration=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.fetch_page = fetch_page
+        self.decoration = decoration
+        self.page_size = page_size
+        self.rows = []
+        self.filter_text = ""
+        self.more = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DecorationRole and self.decoration and index.isValid() and index.column() == 0:
+            return self.decoration(self.rows[index.row()])
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        # first item of each row is the key used for paging and deleting
+        value = self.rows[index.row()][index.column() + 1]
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.more
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        last_key = self.rows[-1][0] if self.rows else None
+        try:
+            rows = self.fetch_page(self.filter_text, last_key, self.page_size)
+        except Exception as e:
+            print(f"settings: error loading rows {e}")
+            rows = []
+        self.more = len(rows) == self.page_size
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.filter_text = text.strip()
+        self.rows = []
+        self.more = True
+        self.endResetModel()
+
+    def reload(self):
+        self.set_filter(self.filter_text)
+
+    def keys(self, indexes):
+        return sorted({self.rows[index.row()][0] for index in indexes})
+
+    def refresh_decorations(self):
+        if self.decoration and self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, 0), [Qt.ItemDataRole.DecorationRole])
+
+
 class SettingsTab(QWidget):
     def __init__(self, browser):
         super().__init__()
@@ -2057,6 +4659,29 @@ class SettingsTab(QWidget):
         self.restore_session_checkbox.stateChanged.connect(self.on_restore_session_changed)
         startup_layout.addWidget(self.restore_session_checkbox)
 
+        restore_bg_row = QHBoxLayout()
+        self.restore_background_checkbox = QCheckBox(self.translator.tr("restore_in_background", "Load restored tabs in the background, this many at a time:"))
+        self.restore_background_checkbox.setChecked(self.browser.settings.get("restore_in_background", False))
+        self.restore_background_checkbox.setStyleSheet(self.welcome_checkbox.styleSheet())
+        self.restore_background_checkbox.stateChanged.connect(self.on_restore_background_changed)
+        restore_bg_row.addWidget(self.restore_background_checkbox)
+
+        self.restore_concurrency_spin = QSpinBox()
+        self.restore_concurrency_spin.setRange(1, 16)
+        self.restore_concurrency_spin.setValue(int(self.browser.settings.get("restore_concurrency", 3)))
+        self.restore_concurrency_spin.setStyleSheet("QSpinBox { background: #3c3c3c; color: white; border: 1px solid #555; border-radius: 5px; padding: 3px; }")
+        self.restore_concurrency_spin.valueChanged.connect(self.on_restore_concurrency_changed)
+        restore_bg_row.addWidget(self.restore_concurrency_spin)
+        restore_bg_row.addStretch()
+        startup_layout.addLayout(restore_bg_row)
+
+        self.discord_site_checkbox = QCheckBox(self.translator.tr("discord_show_site", "Show the current site in Discord status"))
+        self.discord_site_checkbox.setChecked(self.browser.settings.get("discord_show_site", False))
+        self.discord_site_checkbox.setStyleSheet(self.welcome_checkbox.styleSheet())
+        self.discord_site_checkbox.setEnabled(DISCORD_RPC_AVAILABLE)
+        self.discord_site_checkbox.stateChanged.connect(self.on_discord_site_changed)
+        startup_layout.addWidget(self.discord_site_checkbox)
+
         self.main_layout.addWidget(startup_group)
 
         memory_group = QGroupBox(self.translator.tr("memory_settings", "Memory Settings"))
@@ -2069,6 +4694,81 @@ class SettingsTab(QWidget):
         self.memory_saver_checkbox.stateChanged.connect(self.on_memory_saver_changed)
         memory_layout.addWidget(self.memory_saver_checkbox)
 
+        spin_style = "QSpinBox { background: #3c3c3c; color: white; border: 1px solid #555; border-radius: 5px; padding: 3px; }"
+        freeze_row = QHBoxLayout()
+        freeze_label = QLabel(self.translator.tr("freeze_after", "Freeze background tabs after this many minutes:"))
+        freeze_label.setStyleSheet("color: white; font-size: 14px;")
+        freeze_row.addWidget(freeze_label)
+        self.freeze_after_spin = QSpinBox()
+        self.freeze_after_spin.setRange(1, 120)
+        self.freeze_after_spin.setValue(int(self.browser.settings.get("freeze_after_minutes", 5)))
+        self.freeze_after_spin.setStyleSheet(spin_style)
+        self.freeze_after_spin.valueChanged.connect(self.on_freeze_after_changed)
+        freeze_row.addWidget(self.freeze_after_spin)
+        freeze_row.addStretch()
+        memory_layout.addLayout(freeze_row)
+
+        discard_row = QHBoxLayout()
+        discard_label = QLabel(self.translator.tr("discard_after", "Unload background tabs after this many minutes:"))
+        discard_label.setStyleSheet("color: white; font-size: 14px;")
+        discard_row.addWidget(discard_label)
+        self.discard_after_spin = QSpinBox()
+        self.discard_after_spin.setRange(1, 1440)
+        self.discard_after_spin.setValue(int(self.browser.settings.get("discard_after_minutes", 30)))
+        self.discard_after_spin.setStyleSheet(spin_style)
+        self.discard_after_spin.valueChanged.connect(self.on_discard_after_changed)
+        discard_row.addWidget(self.discard_after_spin)
+        discard_row.addStretch()
+        memory_layout.addLayout(discard_row)
+
+        pool_row = QHBoxLayout()
+        pool_label = QLabel(self.translator.tr("webview_pool_size", "Tabs kept ready for instant opening:"))
+        pool_label.setStyleSheet("color: white; font-size: 14px;")
+        pool_row.addWidget(pool_label)
+        self.pool_size_spin = QSpinBox()
+        self.pool_size_spin.setRange(0, 8)
+        self.pool_size_spin.setValue(self.browser.view_pool.size)
+        self.pool_size_spin.setStyleSheet(spin_style)
+        self.pool_size_spin.valueChanged.connect(self.on_pool_size_changed)
+        pool_row.addWidget(self.pool_size_spin)
+        self.pool_stats_label = QLabel()
+        self.pool_stats_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        pool_row.addWidget(self.pool_stats_label)
+        pool_row.addStretch()
+        memory_layout.addLayout(pool_row)
+        self.update_pool_stats()
+
+        closed_row = QHBoxLayout()
+        closed_label = QLabel(self.translator.tr("closed_tab_grace", "Keep closed tabs ready to reopen for this many seconds:"))
+        closed_label.setStyleSheet("color: white; font-size: 14px;")
+        closed_row.addWidget(closed_label)
+        self.closed_grace_spin = QSpinBox()
+        self.closed_grace_spin.setRange(0, 600)
+        self.closed_grace_spin.setValue(int(self.browser.settings.get("closed_tab_grace_seconds", 60)))
+        self.closed_grace_spin.setStyleSheet(spin_style)
+        self.closed_grace_spin.valueChanged.connect(self.on_closed_grace_changed)
+        closed_row.addWidget(self.closed_grace_spin)
+        closed_row.addStretch()
+        memory_layout.addLayout(closed_row)
+
+        energy_row = QHBoxLayout()
+        self.energy_saver_checkbox = QCheckBox(self.translator.tr("energy_saver", "Energy saver (mute and freeze hidden tabs, except pinned or playing ones)"))
+        self.energy_saver_checkbox.setChecked(self.browser.settings.get("energy_saver", False))
+        self.energy_saver_checkbox.setStyleSheet(self.welcome_checkbox.styleSheet())
+        self.energy_saver_checkbox.stateChanged.connect(self.on_energy_saver_changed)
+        energy_row.addWidget(self.energy_saver_checkbox)
+        self.energy_stats_label = QLabel()
+        self.energy_stats_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        energy_row.addWidget(self.energy_stats_label)
+        energy_row.addStretch()
+        memory_layout.addLayout(energy_row)
+        self.update_energy_stats()
+
+        task_manager_btn = QPushButton(self.translator.tr("task_manager", "Task Manager"))
+        task_manager_btn.setStyleSheet("QPushButton { background: #0078d4; color: white; border: none; padding: 8px 16px; border-radius: 6px; font-size: 14px; } QPushButton:hover { background: #106ebe; }")
+        task_manager_btn.clicked.connect(self.browser.open_task_manager)
+        memory_layout.addWidget(task_manager_btn, alignment=Qt.AlignmentFlag.AlignLeft)
+
         self.main_layout.addWidget(memory_group)
 
         extensions_group = QGroupBox(self.translator.tr("extensions", "Extensions"))
@@ -2122,24 +4822,21 @@ class SettingsTab(QWidget):
         pw_buttons_layout.addWidget(self.export_btn)
         passwords_layout.addLayout(pw_buttons_layout)
 
-        self.pw_text = QTextEdit()
-        self.pw_text.setReadOnly(True)
-        self.pw_text.setMaximumHeight(150)
-        self.pw_text.setStyleSheet(self.ext_text.styleSheet())
-        passwords_layout.addWidget(self.pw_text)
-        self.update_pw_view()
+        self.pw_model = StoreTableModel(
+            [self.translator.tr("site", "Site"), self.translator.tr("username", "Username"), self.translator.tr("password", "Password")],
+            self.fetch_password_page, parent=self)
+        self.pw_filter, self.pw_view = self.create_store_list(passwords_layout, self.pw_model, self.delete_selected_passwords)
         self.main_layout.addWidget(passwords_group)
 
         history_group = QGroupBox(self.translator.tr("history", "History"))
         history_group.setStyleSheet(general_group.styleSheet())
         history_layout = QVBoxLayout(history_group)
 
-        self.hist_text = QTextEdit()
-        self.hist_text.setReadOnly(True)
-        self.hist_text.setMaximumHeight(150)
-        self.hist_text.setStyleSheet(self.ext_text.styleSheet())
-        history_layout.addWidget(self.hist_text)
-        self.update_history_view()
+        self.history_model = StoreTableModel(
+            [self.translator.tr("url", "URL"), self.translator.tr("title", "Title"),
+             self.translator.tr("last_visited", "Last visited"), self.translator.tr("visits", "Visits")],
+            self.fetch_history_page, parent=self, decoration=lambda row: self.browser.cached_site_icon(row[1]))
+        self.history_filter, self.history_view = self.create_store_list(history_layout, self.history_model, self.delete_selected_history)
         self.main_layout.addWidget(history_group)
 
         self.main_layout.addStretch()
@@ -2186,20 +4883,65 @@ class SettingsTab(QWidget):
         self.browser.settings["show_welcome_screen"] = (state == Qt.CheckState.Checked.value)
         self.browser.save_settings()
 
-    def on_search_engine_changed(self, engine_name):
-        self.browser.set_search_engine(engine_name)
+    def on_search_engine_changed(self, engine_name):
+        self.browser.set_search_engine(engine_name)
+
+    def on_theme_changed(self, theme_name):
+        self.browser.set_theme(theme_name)
+
+    def on_memory_saver_changed(self, state):
+        self.browser.settings["memory_saver"] = (state == Qt.CheckState.Checked.value)
+        self.browser.save_settings()
+        self.browser.enable_memory_saver(state == Qt.CheckState.Checked.value)
+
+    def on_restore_session_changed(self, state):
+        self.browser.settings["restore_session"] = (state == Qt.CheckState.Checked.value)
+        self.browser.save_settings()
+
+    def on_freeze_after_changed(self, value):
+        self.browser.settings["freeze_after_minutes"] = value
+        self.browser.save_settings()
+
+    def on_discard_after_changed(self, value):
+        self.browser.settings["discard_after_minutes"] = value
+        self.browser.save_settings()
+
+    def on_closed_grace_changed(self, value):
+        self.browser.settings["closed_tab_grace_seconds"] = value
+        self.browser.save_settings()
+
+    def on_energy_saver_changed(self, state):
+        enabled = state == Qt.CheckState.Checked.value
+        self.browser.settings["energy_saver"] = enabled
+        self.browser.save_settings()
+        self.browser.energy_saver.set_enabled(enabled)
+
+    def update_energy_stats(self):
+        self.energy_stats_label.setText(
+            self.translator.tr("energy_saved", "CPU time saved: {:.0f} s").format(self.browser.energy_saver.cpu_saved))
+
+    def on_pool_size_changed(self, value):
+        self.browser.settings["webview_pool_size"] = value
+        self.browser.save_settings()
+        self.browser.view_pool.resize(value)
+        self.update_pool_stats()
+
+    def update_pool_stats(self):
+        stats = self.browser.view_pool.stats()
+        self.pool_stats_label.setText(self.translator.tr("webview_pool_stats", "{} hits / {} misses").format(stats['hits'], stats['misses']))
 
-    def on_theme_changed(self, theme_name):
-        self.browser.set_theme(theme_name)
+    def on_restore_background_changed(self, state):
+        self.browser.settings["restore_in_background"] = (state == Qt.CheckState.Checked.value)
+        self.browser.save_settings()
 
-    def on_memory_saver_changed(self, state):
-        self.browser.settings["memory_saver"] = (state == Qt.CheckState.Checked.value)
+    def on_restore_concurrency_changed(self, value):
+        self.browser.settings["restore_concurrency"] = value
         self.browser.save_settings()
-        self.browser.enable_memory_saver(state == Qt.CheckState.Checked.value)
 
-    def on_restore_session_changed(self, state):
-        self.browser.settings["restore_session"] = (state == Qt.CheckState.Checked.value)
+    def on_discord_site_changed(self, state):
+        self.browser.settings["discord_show_site"] = (state == Qt.CheckState.Checked.value)
         self.browser.save_settings()
+        self.browser.update_presence()
 
     def update_extensions_view(self):
         if not self.browser.extensions:
@@ -2213,14 +4955,80 @@ class SettingsTab(QWidget):
                 ext_info += f"  Script: {ext_data.get('script', 'No script')}\n\n"
             self.ext_text.setText(ext_info)
 
+    def create_store_list(self, layout, model, delete_handler):
+        filter_edit = QLineEdit()
+        filter_edit.setPlaceholderText(self.translator.tr("filter_placeholder", "Filter..."))
+        filter_edit.setStyleSheet("QLineEdit { background: #2b2b2b; color: white; border: 1px solid #555; border-radius: 5px; padding: 5px; }")
+        layout.addWidget(filter_edit)
+
+        view = QTableView()
+        view.setModel(model)
+        view.setMaximumHeight(220)
+        view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        view.verticalHeader().hide()
+        view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        view.setStyleSheet("""
+            QTableView {
+                background: #2b2b2b;
+                color: white;
+                border: 1px solid #555;
+                border-radius: 5px;
+                font-size: 12px;
+                selection-background-color: #0078d4;
+            }
+            QHeaderView::section {
+                background: #3c3c3c;
+                color: white;
+                border: none;
+                padding: 4px;
+            }
+        """)
+        layout.addWidget(view)
+
+        # typing restarts the timer, so the query only runs once the user pauses
+        filter_timer = QTimer(self)
+        filter_timer.setSingleShot(True)
+        filter_timer.setInterval(250)
+        filter_timer.timeout.connect(lambda: model.set_filter(filter_edit.text()))
+        filter_edit.textChanged.connect(lambda _: filter_timer.start())
+
+        delete_btn = QPushButton(self.translator.tr("delete_selected", "Delete selected"))
+        delete_btn.setStyleSheet(self.import_btn.styleSheet())
+        delete_btn.clicked.connect(delete_handler)
+        layout.addWidget(delete_btn, alignment=Qt.AlignmentFlag.AlignRight)
+        return filter_edit, view
+
+    def fetch_password_page(self, filter_text, after, limit):
+        return [(name, name, user, pw) for name, user, pw in self.browser.store.password_page(filter_text, after, limit)]
+
+    def fetch_history_page(self, filter_text, after, limit):
+        rows = self.browser.history.page(filter_text, after, limit)
+        return [((last_visit, url_id), url, title, datetime.fromtimestamp(last_visit).strftime("%Y-%m-%d %H:%M"), visit_count)
+                for url_id, url, title, last_visit, visit_count in rows]
+
+    def delete_selected_passwords(self):
+        names = self.pw_model.keys(self.pw_view.selectionModel().selectedRows())
+        if not names:
+            return
+        for name in names:
+            self.browser.passwords.pop(name, None)
+        self.browser.save_passwords()
+        self.update_pw_view()
+
+    def delete_selected_history(self):
+        keys = self.history_model.keys(self.history_view.selectionModel().selectedRows())
+        if not keys:
+            return
+        self.browser.delete_history([url_id for last_visit, url_id in keys])
+        self.update_history_view()
+
     def update_pw_view(self):
-        s = ""
-        for site,info in self.browser.passwords.items():
-            s += f"{site} - {info['user']} / {info['pass']}\n"
-        self.pw_text.setText(s)
+        self.pw_model.reload()
 
     def update_history_view(self):
-        self.hist_text.setText("\n".join(self.browser.history))
+        self.history_model.reload()
 
     def import_csv(self):
         path,_ = QFileDialog.getOpenFileName(self,
@@ -2232,6 +5040,7 @@ class SettingsTab(QWidget):
                 reader = csv.DictReader(f)
                 for row in reader:
                     self.browser.passwords[row["name"]] = {"user":row["username"], "pass":row["password"]}
+            self.browser.save_passwords()
             self.update_pw_view()
 
     def export_csv(self):
@@ -2247,15 +5056,194 @@ class SettingsTab(QWidget):
                     writer.writerow([name,"",info["user"],info["pass"],""])
             self.update_pw_view()
 
+class TaskManagerTab(QWidget):
+    """Lists tabs with their renderer process, cpu and memory, and lets the user unload or end them."""
+
+    def __init__(self, browser):
+        super().__init__()
+        self.browser = browser
+        self.translator = browser.translator
+        self.samples = {}
+        self.rows = []
+        self.setStyleSheet("background: #1e1e1e;")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(10)
+
+        title = QLabel(self.translator.tr("task_manager", "Task Manager"))
+        title.setStyleSheet("color:white;font-size:24px;font-weight:bold;")
+        layout.addWidget(title)
+
+        interval_row = QHBoxLayout()
+        interval_label = QLabel(self.translator.tr("task_manager_interval", "Refresh every this many seconds:"))
+        interval_label.setStyleSheet("color: white; font-size: 14px;")
+        interval_row.addWidget(interval_label)
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(1, 60)
+        self.interval_spin.setValue(int(self.browser.settings.get("task_manager_interval", 2)))
+        self.interval_spin.setStyleSheet("QSpinBox { background: #3c3c3c; color: white; border: 1px solid #555; border-radius: 5px; padding: 3px; }")
+        self.interval_spin.valueChanged.connect(self.on_interval_changed)
+        interval_row.addWidget(self.interval_spin)
+        interval_row.addStretch()
+        self.navigation_label = QLabel()
+        self.navigation_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        interval_row.addWidget(self.navigation_label)
+        layout.addLayout(interval_row)
+
+        self.model = QStandardItemModel(self)
+        self.model.setHorizontalHeaderLabels([
+            self.translator.tr("title", "Title"),
+            self.translator.tr("process_id", "Process ID"),
+            self.translator.tr("cpu", "CPU"),
+            self.translator.tr("memory", "Memory"),
+            self.translator.tr("proportional_memory", "Proportional memory"),
+            self.translator.tr("last_active", "Last active"),
+            self.translator.tr("tab_state", "State"),
+        ])
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.verticalHeader().hide()
+        self.view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.view.setStyleSheet("""
+            QTableView {
+                background: #2b2b2b;
+                color: white;
+                border: 1px solid #555;
+                border-radius: 5px;
+                font-size: 12px;
+                selection-background-color: #0078d4;
+            }
+            QHeaderView::section {
+                background: #3c3c3c;
+                color: white;
+                border: none;
+                padding: 4px;
+            }
+        """)
+        layout.addWidget(self.view)
+
+        button_style = """
+            QPushButton {
+                background: #0078d4;
+                color: white;
+                border: none;
+                padding: 8px 16px;
+                border-radius: 6px;
+                font-size: 14px;
+            }
+            QPushButton:hover { background: #106ebe; }
+        """
+        button_row = QHBoxLayout()
+        button_row.addStretch()
+        for key, text, handler in [("freeze_tab", "Freeze", self.freeze_selected),
+                                   ("discard_tab", "Unload", self.discard_selected),
+                                   ("end_process", "End process", self.kill_selected)]:
+            btn = QPushButton(self.translator.tr(key, text))
+            btn.setStyleSheet(button_style)
+            btn.clicked.connect(handler)
+            button_row.addWidget(btn)
+        layout.addLayout(button_row)
+
+        self.sampler = ProcessSampler(self.interval_spin.value())
+        self.sampler.sampled.connect(self.on_sampled)
+        self.refresh()
+        self.sampler.start()
+
+    def renderer_pid(self, tab):
+        view = getattr(tab, 'web_view', None)
+        if view and view.page():
+            return view.page().renderProcessPid()
+        return 0
+
+    def refresh(self):
+        stats = self.browser.navigation.stats()
+        self.navigation_label.setText(self.translator.tr("navigation_stats", "{} loading, {} queued, average wait {:.1f} s, longest {:.1f} s").format(
+            stats['loading'], stats['queued'], stats['avg_wait'], stats['max_wait']))
+        tabs = [self.browser.tab_registry.widget(record.tab_id) for record in self.browser.tab_registry]
+        self.rows = [None] + tabs
+        pids = {os.getpid()} | {self.renderer_pid(tab) for tab in tabs}
+        pids.discard(0)
+        self.sampler.set_pids(pids)
+
+        now = time.monotonic()
+        self.model.setRowCount(len(self.rows))
+        for row, tab in enumerate(self.rows):
+            if tab is None:
+                pid = os.getpid()
+                cells = [self.translator.tr("browser_process", "Browser"), str(pid), "", "", "", "", ""]
+            else:
+                record = self.browser.tab_registry.record(tab)
+                pid = self.renderer_pid(tab)
+                age = int(now - record.last_access)
+                cells = [record.title or record.url or "", str(pid) if pid else "-", "", "", "",
+                         f"{age // 60}:{age % 60:02d}", record.discard_state]
+            sample = self.samples.get(pid)
+            if sample:
+                cells[2] = f"{sample['cpu']:.1f}%"
+                cells[3] = f"{sample['rss'] / 1024 / 1024:.0f} MB"
+                if sample['pss'] is not None:
+                    cells[4] = f"{sample['pss'] / 1024 / 1024:.0f} MB"
+            for column, text in enumerate(cells):
+                item = self.model.item(row, column)
+                if item is None:
+                    self.model.setItem(row, column, QStandardItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+
+    def on_sampled(self, samples):
+        self.samples = samples
+        self.refresh()
+
+    def on_interval_changed(self, value):
+        self.browser.settings["task_manager_interval"] = value
+        self.browser.save_settings()
+        self.sampler.set_interval(value)
+
+    def selected_tabs(self):
+        rows = {index.row() for index in self.view.selectionModel().selectedRows()}
+        return [self.rows[row] for row in sorted(rows) if row < len(self.rows) and self.rows[row] is not None]
+
+    def freeze_selected(self):
+        for tab in self.selected_tabs():
+            self.browser.discarder.freeze(tab)
+        self.refresh()
+
+    def discard_selected(self):
+        current = self.browser.tabs.currentWidget()
+        for tab in self.selected_tabs():
+            if tab is not current:
+                self.browser.discarder.discard(tab)
+        self.refresh()
+
+    def kill_selected(self):
+        # ending a renderer takes down every tab it hosts, same as chrome's end process
+        pids = {self.renderer_pid(tab) for tab in self.selected_tabs()}
+        pids.discard(0)
+        for pid in pids:
+            try:
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+                print(f"task manager: ended renderer {pid}")
+            except OSError as e:
+                print(f"task manager: could not end renderer {pid} {e}")
+        self.refresh()
+
+    def stop(self):
+        self.sampler.stop()
+
 class Browser(QMainWindow):
+    omnibox_loaded = Signal(object, float)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("cat browser")
         self.resize(1280,800)
-        self.watchdog_timer = QTimer()
-        self.watchdog_timer.timeout.connect(self.check_browser_health)
-        self.watchdog_timer.start(30000)
-        self.translator = Translator()
+        self.shown_once = False
+        with STARTUP_PROFILER.phase("translator"):
+            self.translator = Translator()
         self.search_engines = {
             "Google": "https://www.google.com/search?q={}",
             "Bing": "https://www.bing.com/search?q={}",
@@ -2264,110 +5252,124 @@ class Browser(QMainWindow):
         }
 
         self.themes = {}
-        self.passwords = self.load_passwords()
-        self.history = self.load_history()
+        with STARTUP_PROFILER.phase("open_profile_store"):
+            self.store = ProfileStore(PROFILE_DB)
+            self.history = HistoryEngine(self.store)
+        self.omnibox = OmniboxIndex()
+        # changes made while the full index builds on its thread, replayed onto it before the swap
+        self.omnibox_journal = []
+        self.omnibox_loaded.connect(self.swap_omnibox_index)
+        self.omnibox_choice = None
+        with STARTUP_PROFILER.phase("load_passwords"):
+            self.passwords = self.load_passwords()
         self.extensions = {}
         self.current_theme = None
-        self.current_search_engine = self.load_search_engine()
-        self.settings = self.load_settings()
+        with STARTUP_PROFILER.phase("load_settings"):
+            self.current_search_engine = self.load_search_engine()
+            self.settings = self.load_settings()
 
         lang = self.settings.get("language", "English")
         self.translator.set_language(lang)
 
         self.rpc = None
-        self.init_discord_rpc()
-
-        self.profile = QWebEngineProfile("cat_profile")
-        self.profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies)
-        self.profile.setPersistentStoragePath(DATA_DIR)
-        self.profile.downloadRequested.connect(self.on_download)
-        default_settings = self.profile.settings()
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, False)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.AllowRunningInsecureContent, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.FullScreenSupportEnabled, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.FocusOnNavigationEnabled, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanOpenWindows, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.AllowWindowActivationFromJavaScript, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.ShowScrollBars, True)
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.PdfViewerEnabled, False)
-
-        default_settings.setAttribute(QWebEngineSettings.WebAttribute.FullScreenSupportEnabled, True)
+        self.presence_started = int(time.time())
+        with STARTUP_PROFILER.phase("discord_rpc"):
+            self.init_discord_rpc()
+
+        with STARTUP_PROFILER.phase("profile_setup"):
+            self.profile = QWebEngineProfile("cat_profile")
+            self.profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies)
+            self.profile.setPersistentStoragePath(DATA_DIR)
+            self.profile.downloadRequested.connect(self.on_download)
+            default_settings = self.profile.settings()
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, False)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.AllowRunningInsecureContent, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.FullScreenSupportEnabled, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.FocusOnNavigationEnabled, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanOpenWindows, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.AllowWindowActivationFromJavaScript, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.ShowScrollBars, True)
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.PdfViewerEnabled, False)
+
+            default_settings.setAttribute(QWebEngineSettings.WebAttribute.FullScreenSupportEnabled, True)
 
         self.memory_saver_enabled = self.settings.get("memory_saver", False)
-        self.tab_last_accessed = {}
+        self.tab_registry = TabRegistry()
+        self.thumbnails = ThumbnailCache(THUMBNAIL_DIR)
+        self.favicons = FaviconService(self.store, FAVICON_DIR, self)
+        self.favicons.ready.connect(self.on_favicon_ready)
+        self.discarder = TabDiscarder(self)
+        self.memory_monitor = MemoryPressureMonitor(self)
+        self.energy_saver = EnergySaver(self)
+        self.closed_tabs = ClosedTabStack(self)
+        self.restoring_session = False
+        self.session_entries = {}
+        self.session_dirty = set()
+        self.session_timer = QTimer(self)
+        self.session_timer.setSingleShot(True)
+        self.session_timer.setInterval(2000)
+        self.session_timer.timeout.connect(lambda: self.save_session(full=False))
+        self.navigation = NavigationScheduler(self)
+        self.shared_new_tab_page = None
         self.memory_saver_timer = QTimer()
         if self.memory_saver_enabled:
             self.memory_saver_timer.timeout.connect(self.cleanup_inactive_tabs)
             self.memory_saver_timer.start(60000)
 
-        self.themes = {}
-        self.load_themes()
-        self.theme_engine = ThemeEngine(self)
-        self.load_extensions()
-        self.inject_extensions_into_profile()
-
-        self.setup_ui()
-        self.apply_current_theme()
-
-        if self.settings.get("restore_session", True):
-            self.restore_session()
-        else:
-            self.add_tab(is_new_tab=True)
-
-    def check_browser_health(self):
-        try:
-            import psutil
-            process = psutil.Process()
-            memory_mb = process.memory_info().rss / 1024 / 1024
-
-            if memory_mb > 2000:
-                print(f"browser: high memory usage {memory_mb:.2f} mb, cleaning up...")
-                self.force_cleanup_tabs()
-
-        except ImportError:
-            pass
-        except Exception as e:
-            print(f"watchdog error: {e}")
-
-    def force_cleanup_tabs(self):
-        current_time = datetime.now()
+        self.view_pool = WebViewPool(self, size=int(self.settings.get("webview_pool_size", 2)))
 
-        for i in range(self.tabs.count()):
-            if i == self.tabs.currentIndex():
+        self.themes = {}
+        with STARTUP_PROFILER.phase("load_themes"):
+            self.load_themes()
+            self.theme_engine = ThemeEngine(self)
+        with STARTUP_PROFILER.phase("load_extensions"):
+            self.load_extensions()
+            self.inject_extensions_into_profile()
+
+        with STARTUP_PROFILER.phase("setup_ui"):
+            self.setup_ui()
+        self.energy_saver.set_enabled(self.settings.get("energy_saver", False))
+        with STARTUP_PROFILER.phase("apply_current_theme"):
+            self.apply_current_theme()
+
+        with STARTUP_PROFILER.phase("restore_session"):
+            crashed = self.store.get_meta("clean_exit", "1") == "0"
+            if self.settings.get("restore_session", True):
+                if crashed:
+                    print("browser: previous run did not exit cleanly, restoring its last checkpoint")
+                self.restore_session()
+            elif crashed and self.offer_crash_restore():
+                self.restore_session()
+            else:
+                self.add_tab(is_new_tab=True)
+            self.store.set_meta("clean_exit", 0)
+
+        # fill the view pool once startup work is out of the way
+        self.view_pool.schedule_refill(2000)
+        QTimer.singleShot(1500, self.load_omnibox_index)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.shown_once:
+            self.shown_once = True
+            STARTUP_PROFILER.mark("main_window_shown")
+            # new tab only sessions never paint a web page, so stop recording eventually
+            QTimer.singleShot(15000, STARTUP_PROFILER.finish)
+
+    def idle_background_tabs(self, idle_seconds, states=("live", "frozen")):
+        current = self.tabs.currentWidget()
+        now = time.monotonic()
+        idle = []
+        for record in self.tab_registry:
+            tab = self.tab_registry.widget(record.tab_id)
+            if tab is current or record.discard_state not in states or not getattr(tab, 'web_view', None):
                 continue
-
-            tab = self.tabs.widget(i)
-            if hasattr(tab, 'browser') and tab.browser:
-                tab_id = id(tab)
-                last_access = self.tab_last_accessed.get(tab_id)
-
-                if last_access and (current_time - last_access).seconds > 60:
-                    self.unload_tab_content(i)
-
-    def cleanup_inactive_tabs(self):
-        if not self.memory_saver_enabled:
-            return
-
-        current_time = datetime.now()
-        inactive_threshold = timedelta(minutes=5)
-
-        for i in range(self.tabs.count()):
-            tab = self.tabs.widget(i)
-
-            if hasattr(tab, 'web_view') and tab.web_view:
-                tab_id = id(tab)
-                last_access = self.tab_last_accessed.get(tab_id)
-
-                if last_access:
-                    if current_time - last_access > inactive_threshold:
-                        if self.tabs.currentIndex() != i:
-                            self.unload_tab_content(i)
-                else:
-                    self.tab_last_accessed[tab_id] = current_time
-
+            if now - record.last_access > idle_seconds:
+                idle.append(tab)
+        return idle
 
     def setup_webengine_crash_handler(self):
         os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = "--disable-gpu-compositing --enable-gpu-rasterization --disable-software-rasterizer"
@@ -2388,7 +5390,13 @@ class Browser(QMainWindow):
         self.tabs.setTabsClosable(True)
         self.tabs.setStyleSheet("QTabBar::close-button {width:0;height:0;image:none;}")
         self.tabs.tabCloseRequested.connect(self.close_tab_with_checks)
+        self.tabs.currentChanged.connect(self.on_current_tab_changed)
+        self.tabs.tabBar().preview_provider = self.tab_preview
+        self.tabs.tabBar().setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        QShortcut(QKeySequence("Ctrl+Shift+T"), self, activated=self.reopen_closed_tab)
+        self.tabs.tabBar().customContextMenuRequested.connect(self.show_tab_menu)
         self.tabs.currentChanged.connect(self.update_url_bar)
+        self.tabs.currentChanged.connect(lambda i: self.update_presence())
         main_layout.addWidget(self.tabs)
 
         self.nav_toolbar = QToolBar()
@@ -2408,6 +5416,14 @@ class Browser(QMainWindow):
         self.url_bar = QLineEdit()
         self.update_url_bar_placeholder()
         self.url_bar.returnPressed.connect(self.navigate_to_url)
+        self.omnibox_model = QStandardItemModel(self)
+        self.url_completer = QCompleter(self.omnibox_model, self)
+        self.url_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.url_completer.setCompletionRole(Qt.ItemDataRole.UserRole)
+        self.url_completer.setMaxVisibleItems(8)
+        self.url_completer.activated[QModelIndex].connect(self.on_omnibox_activated)
+        self.url_bar.setCompleter(self.url_completer)
+        self.url_bar.textEdited.connect(self.update_omnibox)
         self.nav_toolbar.addWidget(self.url_bar)
 
         central = QWidget()
@@ -2500,10 +5516,12 @@ class Browser(QMainWindow):
     def close_tab_with_checks(self, i):
         tab = self.tabs.widget(i)
 
-        if isinstance(tab, SettingsTab):
+        if isinstance(tab, (SettingsTab, TaskManagerTab)):
             if self.tabs.count() <= 1:
                 self.add_tab(is_new_tab=True)
 
+            if isinstance(tab, TaskManagerTab):
+                tab.stop()
             self.tabs.removeTab(i)
         else:
             self.close_tab(i)
@@ -2512,195 +5530,81 @@ class Browser(QMainWindow):
         if not self.memory_saver_enabled:
             return
 
-        current_time = datetime.now()
-        inactive_threshold = timedelta(minutes=5)
-
-        for i in range(self.tabs.count()):
-            tab = self.tabs.widget(i)
-
-            if hasattr(tab, 'browser') and tab.browser:
-                tab_id = id(tab)
-                last_access = self.tab_last_accessed.get(tab_id)
-
-                if last_access:
-                    if current_time - last_access > inactive_threshold:
-                        if self.tabs.currentIndex() != i:
-                            self.unload_tab_content(i)
-                else:
-                    self.tab_last_accessed[tab_id] = current_time
-
-    def unload_tab_content(self, tab_index):
-        tab = self.tabs.widget(tab_index)
-        if hasattr(tab, 'web_view') and tab.web_view:
-            try:
-                url = ""
-                if hasattr(tab.web_view, 'url'):
-                    url_obj = tab.web_view.url()
-                    if url_obj:
-                        url = url_obj.toString()
-
-                title = self.tabs.tabText(tab_index)
-
-                if url:
-                    self.save_tab_state(tab_index, url, title)
-
-                try:
-                    if hasattr(tab.web_view, 'page') and tab.web_view.page():
-                        tab.web_view.page().runJavaScript("""
-                            (function() {
-                                var audios = document.getElementsByTagName('audio');
-                                for (var i = 0; i < audios.length; i++) {
-                                    audios[i].pause();
-                                    audios[i].currentTime = 0;
-                                }
-
-                                var videos = document.getElementsByTagName('video');
-                                for (var i = 0; i < videos.length; i++) {
-                                    videos[i].pause();
-                                    videos[i].currentTime = 0;
-                                }
-                            })();
-                        """)
-                except:
-                    pass
-
-                layout = tab.layout()
-                if layout:
-                    for i in reversed(range(layout.count())):
-                        widget = layout.itemAt(i).widget()
-                        if widget:
-                            widget.deleteLater()
-
-                    placeholder_text = "Tab unloaded to save memory"
-                    if url:
-                        placeholder_text += f"\n\nURL: {url}\nClick anywhere to reload"
-
-                    placeholder = QLabel(placeholder_text)
-                    placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    placeholder.setStyleSheet("""
-                        QLabel {
-                            color: white;
-                            background: #2b2b2b;
-                            font-size: 14px;
-                            padding: 40px;
-                            border: 1px solid #444;
-                            border-radius: 8px;
-                        }
-                    """)
-
-                    placeholder.mousePressEvent = lambda event, idx=tab_index: self.restore_tab_content(idx)
-                    layout.addWidget(placeholder)
-
-                tab.web_view.deleteLater()
-                tab.web_view = None
-
-            except Exception as e:
-                print(f"browser: error unloading tab {tab_index}: {e}")
-
-
-    def restore_tab_content(self, tab_index):
-        tab = self.tabs.widget(tab_index)
-        if not hasattr(tab, 'web_view') or tab.web_view is None:
-            tab_states = self.load_tab_states()
-            if str(tab_index) in tab_states:
-                state = tab_states[str(tab_index)]
-
-                layout = tab.layout()
-                if layout:
-                    for i in reversed(range(layout.count())):
-                        widget = layout.itemAt(i).widget()
-                        if widget:
-                            widget.deleteLater()
-
-                try:
-                    tab.web_view = InspectorWebView(self.profile, tab, browser=self)
-                    if state['url']:
-                        tab.web_view.setUrl(QUrl(state['url']))
-                    else:
-                        tab.web_view.setUrl(QUrl("about:blank"))
-
-                    tab.web_view.urlChanged.connect(lambda u, t=tab: self.on_url_change(t))
-                    tab.web_view.titleChanged.connect(lambda t, i=tab_index: self.on_title_change(t, i))
-                    tab.web_view.iconChanged.connect(lambda icon, i=tab_index: self.on_icon_change(icon, i))
-
-                    layout.addWidget(tab.web_view)
-                    self.tab_last_accessed[id(tab)] = datetime.now()
+        freeze_after = int(self.settings.get("freeze_after_minutes", 5)) * 60
+        discard_after = max(freeze_after, int(self.settings.get("discard_after_minutes", 30)) * 60)
+        for tab in self.idle_background_tabs(discard_after):
+            self.discarder.discard(tab)
+        for tab in self.idle_background_tabs(freeze_after, states=("live",)):
+            self.discarder.freeze(tab)
 
-                    self.remove_tab_state(tab_index)
-
-                except Exception as e:
-                    print(f"browser: error restoring tab {tab_index}: {e}")
-                    layout.addWidget(QLabel("failed to restore tab"))
-
-    def save_tab_state(self, tab_index, url, title):
-        try:
-            tab_states = {}
-            if os.path.exists(TAB_STATE_FILE):
-                with open(TAB_STATE_FILE, 'r', encoding='utf-8') as f:
-                    tab_states = json.load(f)
-
-            tab_states[str(tab_index)] = {
-                'url': url,
-                'title': title,
-                'timestamp': datetime.now().isoformat()
+    def session_entry(self, tab, index):
+        if isinstance(tab, SettingsTab):
+            return {
+                'type': 'settings',
+                'title': self.translator.tr("settings", "Settings")
             }
+        elif hasattr(tab, 'new_tab_page') and tab.new_tab_page:
+            return {
+                'type': 'newtab',
+                'title': self.translator.tr("new_tab", "New Tab")
+            }
+        elif self.tab_registry.record(tab) and self.tab_registry.record(tab).url:
+            record = self.tab_registry.record(tab)
+            return {
+                'type': 'web',
+                'url': record.url,
+                'title': record.title or self.tabs.tabText(index),
+                'state': self.discarder.session_state(tab)
+            }
+        return None
 
-            with open(TAB_STATE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(tab_states, f, indent=2)
-        except:
-            pass
-
-    def load_tab_states(self):
-        try:
-            if os.path.exists(TAB_STATE_FILE):
-                with open(TAB_STATE_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+    def mark_session_dirty(self, tab=None):
+        record = self.tab_registry.record(tab) if tab is not None else None
+        if record:
+            self.session_dirty.add(record.tab_id)
+        # the first change starts the timer and later ones ride along, so a busy page cannot hold it off
+        if not self.restoring_session and not self.session_timer.isActive():
+            self.session_timer.start()
 
-    def save_session(self):
+    def save_session(self, full=True):
         try:
-            session_data = {
-                'tabs': [],
-                'current_tab': self.tabs.currentIndex(),
-                'timestamp': datetime.now().isoformat()
-            }
-
+            tabs = []
             for i in range(self.tabs.count()):
                 tab = self.tabs.widget(i)
-
-                if isinstance(tab, SettingsTab):
-                    session_data['tabs'].append({
-                        'type': 'settings',
-                        'title': self.translator.tr("settings", "Settings")
-                    })
-                elif hasattr(tab, 'new_tab_page') and tab.new_tab_page:
-                    session_data['tabs'].append({
-                        'type': 'newtab',
-                        'title': self.translator.tr("new_tab", "New Tab")
-                    })
-                elif hasattr(tab, 'browser') and tab.browser:
-                    url = tab.browser.url().toString()
-                    title = self.tabs.tabText(i)
-                    session_data['tabs'].append({
-                        'type': 'web',
-                        'url': url,
-                        'title': title
-                    })
-
-            with open(SESSION_FILE, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2)
+                record = self.tab_registry.record(tab)
+                if record is None:
+                    entry = self.session_entry(tab, i)
+                else:
+                    # serializing a tab's back/forward history is the costly part, so clean tabs reuse their last entry
+                    if full or record.tab_id in self.session_dirty or record.tab_id not in self.session_entries:
+                        self.session_entries[record.tab_id] = self.session_entry(tab, i)
+                    entry = self.session_entries[record.tab_id]
+                if entry:
+                    tabs.append(entry)
+            self.session_dirty.clear()
+            live = {record.tab_id for record in self.tab_registry}
+            for tab_id in [tab_id for tab_id in self.session_entries if tab_id not in live]:
+                del self.session_entries[tab_id]
+
+            self.history.writer.push("session", tabs, self.tabs.currentIndex())
         except Exception as e:
             print(f"browser: error saving session {e}")
 
+    def offer_crash_restore(self):
+        if not self.store.load_session():
+            return False
+        answer = QMessageBox.question(self,
+            self.translator.tr("restore_crashed_title", "Restore tabs"),
+            self.translator.tr("restore_crashed", "cat browser did not close properly. Restore the tabs from last time?"))
+        return answer == QMessageBox.StandardButton.Yes
+
     def restore_session(self):
+        self.restoring_session = True
         try:
-            if os.path.exists(SESSION_FILE):
-                with open(SESSION_FILE, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-
+            session_data = self.store.load_session()
+            if session_data:
                 while self.tabs.count() > 0:
+                    self.tab_registry.unregister(self.tabs.widget(0))
                     self.tabs.removeTab(0)
 
                 restored_count = 0
@@ -2713,7 +5617,8 @@ class Browser(QMainWindow):
                         self.add_tab(is_new_tab=True)
                         restored_count += 1
                     elif tab_data.get('url'):
-                        self.add_tab(tab_data['url'])
+                        tab = self.add_lazy_tab(tab_data['url'], tab_data.get('title'))
+                        self.discarder.adopt(tab, tab_data.get('state'))
                         restored_count += 1
 
                 if restored_count == 0:
@@ -2728,98 +5633,79 @@ class Browser(QMainWindow):
         except Exception as e:
             print(f"browser: error restoring session {e}")
             self.add_tab(is_new_tab=True)
+        finally:
+            self.restoring_session = False
 
-    def close_tab(self, i):
-        if self.tabs.count() > 1:
-            tab = self.tabs.widget(i)
-            if hasattr(tab, 'web_view') and tab.web_view:
-                try:
-                    if hasattr(tab.web_view, 'page') and tab.web_view.page():
-                        tab.web_view.page().runJavaScript("""
-                            (function() {
-                                var audios = document.getElementsByTagName('audio');
-                                for (var i = 0; i < audios.length; i++) {
-                                    audios[i].pause();
-                                    audios[i].currentTime = 0;
-                                }
-
-                                var videos = document.getElementsByTagName('video');
-                                for (var i = 0; i < videos.length; i++) {
-                                    videos[i].pause();
-                                    videos[i].currentTime = 0;
-                                }
-                            })();
-                        """)
-                except Exception as e:
-                    print(f"browser: error stopping media: {e}")
+        # the foreground tab loads right away, the rest wait for activation or the background queue
+        self.load_lazy_tab(self.tabs.currentWidget())
+        if self.settings.get("restore_in_background", False):
+            for i in range(self.tabs.count()):
+                if isinstance(self.tabs.widget(i), Tab) and self.tabs.widget(i).is_lazy():
+                    self.navigation.enqueue(self.tabs.widget(i))
 
-                try:
-                    if hasattr(tab.web_view, 'setHtml'):
-                        tab.web_view.setHtml("")
-                except:
-                    pass
+    def destroy_tab(self, tab):
+        if isinstance(tab, Tab):
+            tab.release_new_tab_page()
+        if hasattr(tab, 'web_view') and tab.web_view:
+            # muted first so nothing is heard while the page tears down
+            if tab.web_view.page():
+                tab.web_view.page().setAudioMuted(True)
 
-                tab.web_view.deleteLater()
-                tab.web_view = None
+            try:
+                if hasattr(tab.web_view, 'setHtml'):
+                    tab.web_view.setHtml("")
+            except:
+                pass
 
-            tab_id = id(tab)
-            if tab_id in self.tab_last_accessed:
-                del self.tab_last_accessed[tab_id]
+            tab.web_view.deleteLater()
+            tab.web_view = None
 
-            self.remove_tab_state(i)
+    def close_tab(self, i):
+        if self.tabs.count() > 1:
+            tab = self.tabs.widget(i)
             self.tabs.removeTab(i)
-
-
-    def add_tab(self, url=None, is_new_tab=False):
-        if is_new_tab:
-            new_tab = Tab(self.profile, url, is_new_tab, self, self.translator, self.theme_engine)
-            i = self.tabs.addTab(new_tab, self.translator.tr("new_tab", "New Tab"))
-            self.tabs.setCurrentIndex(i)
-
-            if hasattr(self.theme_engine, 'apply_theme_to_new_tab') and new_tab.new_tab_page:
-                self.theme_engine.apply_theme_to_new_tab(new_tab.new_tab_page)
-
-            return new_tab
-        elif url and url.startswith("settings://"):
-            self.open_settings_tab()
+            record = self.tab_registry.record(tab)
+            if record and record.url and isinstance(tab, Tab):
+                self.closed_tabs.push(tab, i, record)
+            else:
+                self.destroy_tab(tab)
+
+            self.navigation.forget(tab)
+            record = self.tab_registry.unregister(tab)
+            if record:
+                self.discarder.forget(record.tab_id)
+                self.energy_saver.forget(record.tab_id)
+                self.thumbnails.forget(record.tab_id)
+            self.mark_session_dirty()
+
+    def reopen_closed_tab(self):
+        entry = self.closed_tabs.pop()
+        if not entry:
             return None
+        index = min(entry["index"], self.tabs.count())
+        tab = entry["tab"]
+        if tab:
+            record = self.tab_registry.register(tab, entry["url"], entry["title"])
+            record.icon_key = url_host(entry["url"])
+            label = entry["title"] or entry["url"]
+            self.tabs.insertTab(index, tab, label[:20] + "..." if len(label) > 23 else label)
+            page = tab.web_view.page()
+            page.setAudioMuted(False)
+            if page.lifecycleState() != QWebEnginePage.LifecycleState.Active:
+                page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            icon = tab.web_view.icon()
+            if not icon.isNull():
+                self.tabs.setTabIcon(index, icon)
         else:
-            new_tab = Tab(self.profile, url, is_new_tab, self, self.translator, self.theme_engine)
-            i = self.tabs.addTab(new_tab, self.translator.tr("loading", "Loading..."))
-            self.tabs.setCurrentIndex(i)
-
-            if new_tab.web_view:
-                new_tab.web_view.parent_browser = self
-                new_tab.web_view.urlChanged.connect(lambda u, t=new_tab: self.on_url_change(t))
-                new_tab.web_view.titleChanged.connect(lambda t, i=i: self.on_title_change(t, i))
-                new_tab.web_view.iconChanged.connect(lambda icon, i=i: self.on_icon_change(icon, i))
-                new_tab.web_view.urlChanged.connect(lambda u: self.history.append(new_tab.web_view.url().toString()))
-
-                self.tab_last_accessed[id(new_tab)] = datetime.now()
-
-            return new_tab
-
-    def remove_tab_state(self, tab_index):
-        try:
-            if os.path.exists(TAB_STATE_FILE):
-                with open(TAB_STATE_FILE, 'r', encoding='utf-8') as f:
-                    tab_states = json.load(f)
-
-                if str(tab_index) in tab_states:
-                    del tab_states[str(tab_index)]
-
-                    new_states = {}
-                    for key, value in tab_states.items():
-                        old_index = int(key)
-                        if old_index > tab_index:
-                            new_states[str(old_index - 1)] = value
-                        else:
-                            new_states[key] = value
+            tab = self.add_lazy_tab(entry["url"], entry["title"])
+            self.discarder.adopt(tab, entry["state"])
+            self.tabs.tabBar().moveTab(self.tabs.indexOf(tab), index)
+            record = self.tab_registry.record(tab)
+        record.pinned = entry["pinned"]
+        self.tabs.setCurrentWidget(tab)
+        self.mark_session_dirty(tab)
+        return tab
 
-                    with open(TAB_STATE_FILE, 'w', encoding='utf-8') as f:
-                        json.dump(new_states, f, indent=2)
-        except:
-            pass
 
     def apply_current_theme(self):
         theme_name = self.settings.get("theme", self.translator.tr("default_theme", "Default Theme"))
@@ -2831,22 +5717,26 @@ class Browser(QMainWindow):
             "language": "English",
             "theme": self.translator.tr("default_theme", "Default Theme"),
             "memory_saver": False,
-            "restore_session": True
+            "freeze_after_minutes": 5,
+            "discard_after_minutes": 30,
+            "energy_saver": False,
+            "closed_tab_grace_seconds": 60,
+            "restore_session": True,
+            "restore_in_background": False,
+            "restore_concurrency": 3,
+            "webview_pool_size": 2,
+            "discord_show_site": False
         }
-        if os.path.exists(SETTINGS_FILE):
-            try:
-                with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                    loaded_settings = json.load(f)
-                    settings.update(loaded_settings)
-            except Exception as e:
-                print(f"settings: error loading user settings {e}")
+        try:
+            settings.update(self.store.load_settings())
+        except Exception as e:
+            print(f"settings: error loading user settings {e}")
         return settings
 
     def save_settings(self):
         self.settings["language"] = self.translator.current_lang
         try:
-            with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=2)
+            self.store.save_settings(self.settings)
         except Exception as e:
             print(f"settings: error saving user settings {e}")
 
@@ -2856,24 +5746,33 @@ class Browser(QMainWindow):
             if isinstance(widget, SettingsTab):
                 self.tabs.setTabText(i, self.translator.tr("settings", "Settings"))
                 widget.update_extensions_view()
-            elif hasattr(widget, 'new_tab_page') and widget.new_tab_page:
-                widget.new_tab_page.search_bar.setPlaceholderText(
-                    self.translator.tr("search_placeholder", "search google or enter url")
-                )
+            elif isinstance(widget, TaskManagerTab):
+                self.tabs.setTabText(i, self.translator.tr("task_manager", "Task Manager"))
+
+        for page in self.new_tab_pages():
+            page.search_bar.setPlaceholderText(
+                self.translator.tr("search_placeholder", "search google or enter url")
+            )
 
         self.update_url_bar_placeholder()
 
     def init_discord_rpc(self):
         if DISCORD_RPC_AVAILABLE:
-            try:
-                self.rpc = Presence(DISCORD_APP_ID)
-                self.rpc.connect()
-                self.rpc.update(state="browsing the web", details="made by anameless_guy on discord")
-                print("discord rpc: connected")
+            self.rpc = DiscordPresenceWorker(DISCORD_APP_ID)
+            self.rpc.start()
+            self.update_presence()
 
-            except Exception as e:
-                print(f"discord rpc: failed {e}")
-                self.rpc = None
+    def update_presence(self):
+        if not self.rpc:
+            return
+        state = "browsing the web"
+        if self.settings.get("discord_show_site", False) and hasattr(self, 'tabs'):
+            tab = self.tabs.currentWidget()
+            if hasattr(tab, 'web_view') and tab.web_view:
+                host = tab.web_view.url().host().replace('www.', '')
+                if host:
+                    state = f"on {host}"
+        self.rpc.push(state=state, details=DISCORD_DETAILS, start=self.presence_started)
 
     def update_url_bar_placeholder(self):
         self.url_bar.setPlaceholderText(
@@ -2896,21 +5795,17 @@ class Browser(QMainWindow):
             print(f"settings: search engine changed to {engine_name}")
 
     def load_search_engine(self):
-        if os.path.exists(SEARCH_ENGINE_FILE):
-            try:
-                with open(SEARCH_ENGINE_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    engine = data.get("engine", "Google")
-                    if engine in self.search_engines:
-                        return engine
-            except Exception as e:
-                print(f"settings: error loading search engine {e}")
+        try:
+            engine = self.store.get_meta("search_engine", "Google")
+            if engine in self.search_engines:
+                return engine
+        except Exception as e:
+            print(f"settings: error loading search engine {e}")
         return "Google"
 
     def save_search_engine(self):
         try:
-            with open(SEARCH_ENGINE_FILE, "w", encoding="utf-8") as f:
-                json.dump({"engine": self.current_search_engine}, f, indent=2)
+            self.store.set_meta("search_engine", self.current_search_engine)
         except Exception as e:
             print(f"settings: error saving search engine {e}")
 
@@ -2922,10 +5817,8 @@ class Browser(QMainWindow):
         self.style().unpolish(self)
         self.style().polish(self)
 
-        for i in range(self.tabs.count()):
-            tab = self.tabs.widget(i)
-            if hasattr(tab, 'new_tab_page') and tab.new_tab_page:
-                tab.new_tab_page.set_default_background()
+        for page in self.new_tab_pages():
+            page.set_default_background()
 
     def load_extensions(self):
         if not os.path.exists(EXTENSIONS_DIR):
@@ -2975,74 +5868,281 @@ class Browser(QMainWindow):
                 self.profile.scripts().insert(script)
 
     def load_passwords(self):
-        passwords = {}
-        if os.path.exists(PASSWORDS_FILE):
-            try:
-                with open(PASSWORDS_FILE, "r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if "name" in row and "username" in row and "password" in row:
-                            passwords[row["name"]] = {"user": row["username"], "pass": row["password"]}
-            except Exception as e:
-                print(f"settings: error loading passwords {e}")
-        return passwords
+        try:
+            return self.store.load_passwords()
+        except Exception as e:
+            print(f"settings: error loading passwords {e}")
+            return {}
 
     def save_passwords(self):
         try:
-            with open(PASSWORDS_FILE, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["name", "username", "password"])
-                for name, info in self.passwords.items():
-                    writer.writerow([name, info["user"], info["pass"]])
+            self.store.save_passwords(self.passwords)
         except Exception as e:
             print(f"settings: error saving passwords: {e}")
 
-    def load_history(self):
-        history = []
-        if os.path.exists(HISTORY_FILE):
-            try:
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    history = json.load(f)
-            except Exception as e:
-                print(f"settings: error loading history {e}")
-        return history
+    def record_history(self, web_view):
+        page = web_view.page()
+        transition = page.take_transition() if isinstance(page, InspectorWebPage) else "link"
+        url = web_view.url().toString()
+        try:
+            visited_at = self.history.add_visit(url, transition)
+            if visited_at:
+                self.update_omnibox_index("record_visit", url, transition, visited_at=visited_at)
+        except Exception as e:
+            print(f"settings: error saving history {e}")
 
-    def save_history(self):
+    def record_history_title(self, web_view, title):
+        url = web_view.url().toString()
         try:
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.history, f, indent=2)
+            self.history.set_title(url, title)
+            self.update_omnibox_index("set_title", url, title)
         except Exception as e:
             print(f"settings: error saving history {e}")
 
+    def load_omnibox_index(self):
+        shortcuts = self.store.shortcuts()
+
+        def build():
+            started = time.perf_counter()
+            index = OmniboxIndex()
+            # sqlite connections stay on the thread that opened them
+            conn = self.store.connect()
+            snapshot = 0.0
+            try:
+                # the first read pins the wal snapshot, taken under the writer lock it matches flushed_until
+                conn.execute("BEGIN")
+                with self.history.writer.flush_lock:
+                    conn.execute("SELECT 1 FROM urls LIMIT 1").fetchall()
+                    snapshot = float(self.history.writer.flushed_until)
+                index.load(conn)
+            except sqlite3.Error as e:
+                print(f"omnibox: error loading history {e}")
+            finally:
+                conn.close()
+            for shortcut in shortcuts:
+                index.add_shortcut(shortcut['url'], shortcut['name'])
+            print(f"omnibox: indexed {len(index)} urls in {time.perf_counter() - started:.2f}s")
+            self.omnibox_loaded.emit(index, snapshot)
+
+        threading.Thread(target=build, name="omnibox-index", daemon=True).start()
+
+    def update_omnibox_index(self, method, *args, visited_at=None):
+        getattr(self.omnibox, method)(*args)
+        if self.omnibox_journal is not None:
+            self.omnibox_journal.append((method, args, visited_at))
+
+    def swap_omnibox_index(self, index, snapshot):
+        # runs on the ui thread, so nothing can slip in between the replay and the swap
+        for method, args, visited_at in self.omnibox_journal or ():
+            # visits the writer had committed before the load read the table are already counted
+            if visited_at is not None and visited_at <= snapshot:
+                continue
+            getattr(index, method)(*args)
+        self.omnibox_journal = None
+        self.omnibox = index
+
+    def open_tab_matches(self, text, limit=3):
+        words = omnibox_text(text.strip()).split()
+        current = self.tab_registry.record(self.tabs.currentWidget())
+        matches = []
+        for record in self.tab_registry:
+            if record is current or not record.url:
+                continue
+            haystack = omnibox_text(record.url) + "\n" + record.title.lower()
+            if all(word in haystack for word in words):
+                matches.append((record.url, record.title))
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def update_omnibox(self, text):
+        self.omnibox_model.clear()
+        if not text.strip():
+            self.url_completer.popup().hide()
+            return
+
+        for url, title in self.open_tab_matches(text):
+            item = QStandardItem(f"{self.translator.tr('omnibox_switch_to_tab', 'Switch to tab')}: {title} - {url}")
+            item.setData(url, Qt.ItemDataRole.UserRole)
+            item.setData(True, Qt.ItemDataRole.UserRole + 1)
+            self.omnibox_model.appendRow(item)
+
+        for url, title, score in self.omnibox.search(text):
+            item = QStandardItem(f"{title} - {url}" if title else url)
+            item.setData(url, Qt.ItemDataRole.UserRole)
+            icon = self.cached_site_icon(url)
+            if icon:
+                item.setIcon(icon)
+            self.omnibox_model.appendRow(item)
+
+        if self.omnibox_model.rowCount():
+            self.url_completer.complete()
+        else:
+            self.url_completer.popup().hide()
+
+    def on_omnibox_activated(self, index):
+        # enter also reaches returnPressed after this, so act once the key event is done
+        self.omnibox_choice = (index.data(Qt.ItemDataRole.UserRole), bool(index.data(Qt.ItemDataRole.UserRole + 1)))
+        QTimer.singleShot(0, self.apply_omnibox_choice)
+
+    def apply_omnibox_choice(self):
+        if not self.omnibox_choice:
+            return
+        url, switch_to_tab = self.omnibox_choice
+        self.omnibox_choice = None
+        if switch_to_tab:
+            for record in self.tab_registry:
+                if record.url == url:
+                    self.tabs.setCurrentWidget(self.tab_registry.widget(record.tab_id))
+                    return
+        self.url_bar.setText(url)
+        self.navigate_to_url()
+
+    def delete_history(self, url_ids):
+        try:
+            for url in self.history.delete_urls(url_ids):
+                self.update_omnibox_index("remove", url)
+        except Exception as e:
+            print(f"settings: error deleting history {e}")
+
     def create_tab_view(self):
         web_view = InspectorWebView(self.profile, browser=self)
         return web_view
 
-    def add_tab(self, url=None, is_new_tab=False):
+    def get_new_tab_page(self):
+        # one page is built lazily and moved into whichever new tab is showing
+        if self.shared_new_tab_page is None:
+            self.shared_new_tab_page = CustomNewTabPage(self, self.translator, self.theme_engine)
+            self.shared_new_tab_page.hide()
+        return self.shared_new_tab_page
+
+    def new_tab_pages(self):
+        return [self.shared_new_tab_page] if self.shared_new_tab_page else []
+
+    def add_tab(self, url=None, is_new_tab=False, background=False):
+        if background and url and url != "about:blank" and not is_new_tab:
+            new_tab = self.add_lazy_tab(url)
+            self.mark_session_dirty(new_tab)
+            self.navigation.enqueue(new_tab)
+            return new_tab
         new_tab = Tab(self.profile, url, is_new_tab, self, self.translator, self.theme_engine)
+        self.tab_registry.register(new_tab, "" if is_new_tab or url == "about:blank" else (url or ""))
         i = self.tabs.addTab(new_tab,
             self.translator.tr("new_tab", "New Tab") if is_new_tab else self.translator.tr("loading", "Loading..."))
-        self.tabs.setCurrentIndex(i)
+        if not background:
+            self.tabs.setCurrentIndex(i)
 
         if not is_new_tab and hasattr(new_tab, 'web_view') and new_tab.web_view:
-            new_tab.web_view.urlChanged.connect(lambda u, t=new_tab: self.on_url_change(t))
-            new_tab.web_view.titleChanged.connect(lambda t, i=i: self.on_title_change(t, i))
-            new_tab.web_view.iconChanged.connect(lambda icon, i=i: self.on_icon_change(icon, i))
-            new_tab.web_view.urlChanged.connect(lambda u: self.history.append(new_tab.web_view.url().toString()))
+            self.connect_web_view(new_tab)
+
+        self.mark_session_dirty(new_tab)
+        return new_tab
 
-            self.tab_last_accessed[id(new_tab)] = datetime.now()
+    def add_lazy_tab(self, url, title=None):
+        new_tab = Tab(self.profile, url, False, self, self.translator, self.theme_engine, lazy=True, title=title)
+        self.tab_registry.register(new_tab, url, title or "")
+        label = title or url
+        i = self.tabs.addTab(new_tab, label[:20] + "..." if len(label) > 23 else label)
 
+        icon = self.cached_site_icon(url)
+        if icon:
+            self.tabs.setTabIcon(i, icon)
         return new_tab
 
-    def on_title_change(self, title, index):
+    def cached_site_icon(self, url):
+        pixmap = self.favicons.icon(url)
+        return QIcon(pixmap) if pixmap else None
+
+    def on_favicon_ready(self, host):
+        pixmap = self.favicons.pixmaps.get(host)
+        if pixmap is None:
+            return
+        icon = QIcon(pixmap)
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            record = self.tab_registry.record(tab)
+            # live pages get their icon from the engine
+            if record and record.icon_key == host and not getattr(tab, 'web_view', None):
+                self.tabs.setTabIcon(i, icon)
+        for row in range(self.omnibox_model.rowCount()):
+            item = self.omnibox_model.item(row)
+            if url_host(item.data(Qt.ItemDataRole.UserRole) or "") == host:
+                item.setIcon(icon)
+        for page in self.new_tab_pages():
+            page.refresh_favicon(host)
+        for i in range(self.tabs.count()):
+            if isinstance(self.tabs.widget(i), SettingsTab):
+                self.tabs.widget(i).history_model.refresh_decorations()
+
+    def connect_web_view(self, tab):
+        web_view = tab.web_view
+        web_view.parent_browser = self
+        web_view.urlChanged.connect(lambda u, t=tab: self.on_url_change(t))
+        web_view.titleChanged.connect(lambda title, t=tab: self.on_title_change(t, title))
+        web_view.iconChanged.connect(lambda icon, t=tab: self.on_icon_change(t, icon))
+        web_view.page().recentlyAudibleChanged.connect(lambda audible, t=tab: self.on_audible_change(t, audible))
+        web_view.urlChanged.connect(lambda u, v=web_view: self.record_history(v))
+        web_view.titleChanged.connect(lambda title, v=web_view: self.record_history_title(v, title))
+        web_view.loadFinished.connect(lambda ok, t=tab: QTimer.singleShot(1000, lambda: self.capture_thumbnail(t)))
+        STARTUP_PROFILER.watch_first_paint(web_view)
+
+        record = self.tab_registry.record(tab)
+        if record:
+            record.discard_state = "live"
+            record.last_access = time.monotonic()
+            self.discarder.forget(record.tab_id)
+        self.energy_saver.on_view_connected(tab)
+
+    def load_lazy_tab(self, tab):
+        if isinstance(tab, Tab) and tab.is_lazy() and tab.load_pending(self.discarder.take_state(tab)):
+            self.connect_web_view(tab)
+            return True
+        return False
+
+    def on_current_tab_changed(self, index):
+        tab = self.tabs.widget(index)
+        self.mark_session_dirty(self.energy_saver.visible_tab)
+        self.tab_registry.touch(tab)
+        self.discarder.thaw(tab)
+        self.energy_saver.on_tab_shown(tab)
+        if isinstance(tab, Tab) and tab.is_new_tab:
+            tab.show_new_tab_page()
+        QTimer.singleShot(1000, lambda t=tab: self.capture_thumbnail(t))
+        if self.restoring_session:
+            return
+        # the current tab jumps the queue and loads outside the background cap
+        self.navigation.promote(tab)
+        self.load_lazy_tab(tab)
+
+    def on_title_change(self, tab, title):
+        record = self.tab_registry.record(tab)
+        if record:
+            record.title = title
+            self.mark_session_dirty(tab)
+        index = self.tabs.indexOf(tab)
+        if index < 0:
+            return
         tab_text = title[:20] + "..." if len(title) > 23 else title
         self.tabs.setTabText(index, tab_text if title else self.translator.tr("new_tab", "New Tab"))
 
-    def on_icon_change(self, icon, index):
+    def on_icon_change(self, tab, icon):
+        index = self.tabs.indexOf(tab)
+        if index < 0:
+            return
+        record = self.tab_registry.record(tab)
         if not icon.isNull():
             self.tabs.setTabIcon(index, icon)
+            if tab.web_view:
+                self.favicons.harvest(tab.web_view.url().toString(), icon)
         else:
-            self.tabs.setTabIcon(index, QIcon())
+            # the engine drops the icon while a page changes or unloads, keep the last known one meanwhile
+            cached = self.cached_site_icon(record.url) if record and record.url else None
+            self.tabs.setTabIcon(index, cached or QIcon())
+
+    def on_audible_change(self, tab, audible):
+        record = self.tab_registry.record(tab)
+        if record:
+            record.audible = audible
 
     def open_settings_tab(self):
         for i in range(self.tabs.count()):
@@ -3050,12 +6150,56 @@ class Browser(QMainWindow):
             if isinstance(w, SettingsTab):
                 self.tabs.setCurrentIndex(i)
                 w.update_extensions_view()
+                w.update_pool_stats()
+                w.update_energy_stats()
                 return
 
         st = SettingsTab(self)
         i = self.tabs.addTab(st, self.translator.tr("settings", "Settings"))
         self.tabs.setCurrentIndex(i)
 
+    def tab_preview(self, index):
+        tab = self.tabs.widget(index)
+        record = self.tab_registry.record(tab)
+        if not record or tab is self.tabs.currentWidget():
+            return None
+        return self.thumbnails.get(record.tab_id)
+
+    def capture_thumbnail(self, tab):
+        # only the visible tab has a fresh frame to grab
+        record = self.tab_registry.record(tab)
+        if record and getattr(tab, 'web_view', None) and tab is self.tabs.currentWidget():
+            self.thumbnails.capture(record.tab_id, tab.web_view)
+
+    def show_tab_menu(self, pos):
+        tab = self.tabs.widget(self.tabs.tabBar().tabAt(pos))
+        record = self.tab_registry.record(tab)
+        menu = QMenu(self)
+        pin_action = None
+        if record and record.pinned:
+            pin_action = menu.addAction(self.translator.tr("unpin_tab", "Unpin tab"))
+        elif record:
+            pin_action = menu.addAction(self.translator.tr("pin_tab", "Pin tab"))
+        reopen_action = menu.addAction(self.translator.tr("reopen_closed_tab", "Reopen closed tab") + "\tCtrl+Shift+T")
+        reopen_action.setEnabled(bool(self.closed_tabs.entries))
+        chosen = menu.exec(self.tabs.tabBar().mapToGlobal(pos))
+        if chosen is reopen_action:
+            self.reopen_closed_tab()
+        elif chosen is not None and chosen is pin_action:
+            record.pinned = not record.pinned
+            if record.pinned:
+                self.energy_saver.unmute(tab)
+
+    def open_task_manager(self):
+        for i in range(self.tabs.count()):
+            if isinstance(self.tabs.widget(i), TaskManagerTab):
+                self.tabs.setCurrentIndex(i)
+                return
+
+        tm = TaskManagerTab(self)
+        i = self.tabs.addTab(tm, self.translator.tr("task_manager", "Task Manager"))
+        self.tabs.setCurrentIndex(i)
+
     def current_browser(self):
         tab = self.tabs.currentWidget()
         if hasattr(tab,"web_view") and tab.web_view:
@@ -3070,6 +6214,8 @@ class Browser(QMainWindow):
             QMessageBox.information(self, "Inspect Element", "No web page to inspect.")
 
     def navigate_to_url(self):
+        if self.omnibox_choice:
+            return
         url = self.url_bar.text().strip()
         if not url:
             return
@@ -3084,14 +6230,19 @@ class Browser(QMainWindow):
     def on_url_change(self, tab):
         if self.tabs.currentWidget() == tab and hasattr(tab, 'web_view') and tab.web_view:
             self.url_bar.setText(tab.web_view.url().toString())
+            self.update_presence()
 
-        tab_id = id(tab)
-        self.tab_last_accessed[tab_id] = datetime.now()
+        record = self.tab_registry.record(tab)
+        if record and tab.web_view:
+            record.url = tab.web_view.url().toString()
+            record.icon_key = url_host(record.url)
+            record.last_access = time.monotonic()
+            self.mark_session_dirty(tab)
 
     def update_url_bar(self, *args):
         tab = self.tabs.currentWidget()
-        if hasattr(tab, "browser") and isinstance(tab.browser, QWebEngineView):
-            self.url_bar.setText(tab.browser.url().toString())
+        if isinstance(tab, Tab):
+            self.url_bar.setText(tab.current_url())
         else:
             self.url_bar.setText("")
 
@@ -3106,34 +6257,62 @@ class Browser(QMainWindow):
 
     def closeEvent(self, event):
         print(f"cat browser closing (plz use it again)")
+        STARTUP_PROFILER.finish()
         self.save_passwords()
-        self.save_history()
         self.save_search_engine()
         self.save_settings()
 
-        if self.settings.get("restore_session", True):
-            self.save_session()
+        self.session_timer.stop()
+        self.save_session()
 
-        if os.path.exists(TAB_STATE_FILE):
-            try:
-                os.remove(TAB_STATE_FILE)
-            except:
-                pass
+        self.memory_monitor.stop()
+        self.closed_tabs.clear()
+        if self.energy_saver.enabled:
+            print(f"energy saver: saved {self.energy_saver.cpu_saved:.1f}s of renderer cpu time")
+        for i in range(self.tabs.count()):
+            if isinstance(self.tabs.widget(i), TaskManagerTab):
+                self.tabs.widget(i).stop()
+
+        pool_stats = self.view_pool.stats()
+        print(f"view pool: {pool_stats['hits']} hits, {pool_stats['misses']} misses")
+        nav_stats = self.navigation.stats()
+        print(f"navigation: {nav_stats['started']} background loads, average wait {nav_stats['avg_wait']:.1f}s, longest {nav_stats['max_wait']:.1f}s")
+        fav_stats = self.favicons.stats
+        print(f"favicons: {fav_stats['hits']} hits, {fav_stats['misses']} misses, {fav_stats['fetched']} fetched, "
+              f"{fav_stats['harvested']} harvested, {fav_stats['revalidated']} revalidated")
+        self.view_pool.clear()
 
         if self.rpc:
             try:
-                self.rpc.close()
+                self.rpc.stop()
             except:
                 pass
 
+        self.thumbnails.close()
+        self.favicons.close()
+        self.history.close()
+        self.store.set_meta("clean_exit", 1)
+        self.store.close()
         event.accept()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    main_window = Browser()
+    if "--bench-omnibox" in sys.argv:
+        run_omnibox_benchmark()
+        sys.exit(0)
+
+    profile_startup, profile_path = parse_profile_startup_arg(sys.argv)
+    if profile_startup:
+        STARTUP_PROFILER.enable(profile_path)
+
+    with STARTUP_PROFILER.phase("qapplication"):
+        app = QApplication(sys.argv)
+    with STARTUP_PROFILER.phase("browser_init"):
+        main_window = Browser()
 
-    if not os.path.exists(SETUP_FILE):
+    if not main_window.store.get_meta("setup_completed"):
+        STARTUP_PROFILER.begin("welcome_screen")
         splash = WelcomeScreen(3000)
+        splash.finished.connect(lambda: STARTUP_PROFILER.end("welcome_screen"))
         splash.show()
 
         class SetupController:
@@ -3146,9 +6325,10 @@ if __name__ == "__main__":
             def show_setup(self):
                 if not self.setup_shown:
                     self.setup_shown = True
-                    setup_wizard = SetupWizard(main_window)
-                    setup_wizard.finished.connect(main_window.show)
-                    setup_wizard.exec()
+                    with STARTUP_PROFILER.phase("setup_wizard"):
+                        setup_wizard = SetupWizard(main_window)
+                        setup_wizard.finished.connect(main_window.show)
+                        setup_wizard.exec()
 
             def start_timer(self):
                 self.timer.start(3500)
@@ -3159,7 +6339,9 @@ if __name__ == "__main__":
 
     else:
         if main_window.settings.get("show_welcome_screen", True):
+            STARTUP_PROFILER.begin("welcome_screen")
             splash = WelcomeScreen(3000)
+            splash.finished.connect(lambda: STARTUP_PROFILER.end("welcome_screen"))
             splash.show()
             splash.finished.connect(main_window.show)
             QTimer.singleShot(3500, main_window.show)